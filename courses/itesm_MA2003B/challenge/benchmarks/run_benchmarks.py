@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite
+
+Times the processing pipeline on synthetic data (see synthetic_data.py), so it can be
+measured without the private workbooks:
+
+    ingest.read.<source>      pd.read_excel of each raw workbook (process_datasets.py)
+    ingest.process.<source>   per-dataset processing block
+    ingest.concat / .write    main_dataframe concat and CSV writing
+    imputation.*              NOX curation and short-gap imputation (method A)
+    metrics.*                 daily max-8h, monthly AUC metrics and daily AQI
+    export.notebook.*         nbconvert HTML export of each notebook (if available)
+    simulation.*              Monte Carlo and queue simulations from MA2004B
+
+Data-dependent benchmarks run once per size (stations x years). Results can be stored
+as a named baseline and compared against it later to catch regressions.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--sizes 2x0.05,4x0.25] [--repeat 3] [--only ingest,metrics]
+    python benchmarks/run_benchmarks.py --save-baseline local
+    python benchmarks/run_benchmarks.py --compare local [--tolerance 0.25]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import runpy
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+BENCH_DIR = Path(__file__).resolve().parent
+CHALLENGE_DIR = BENCH_DIR.parent
+MA2004B_DIR = CHALLENGE_DIR.parents[1] / "itesm_MA2004B"
+BASELINES_DIR = BENCH_DIR / "baselines"
+
+sys.path.insert(0, str(CHALLENGE_DIR / "scripts"))
+sys.path.insert(0, str(BENCH_DIR))
+
+import air_quality  # noqa: E402
+import export_reports  # noqa: E402
+import process_datasets  # noqa: E402
+import synthetic_data  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = "2x0.05,4x0.25"
+
+SIMULATIONS = {
+    'simulation.monte_carlo.transport': MA2004B_DIR / "homeworks" / "tarea_1_mr" / "calculations.py",
+    'simulation.monte_carlo.weather_chain': MA2004B_DIR / "homeworks" / "actividad_1_mr" / "mc_simulation.py",
+    'simulation.monte_carlo.return_times': MA2004B_DIR / "activities" / "class" / "actividad_en_clase_2" / "mc_simulation.py",
+    'simulation.queue.workshop': MA2004B_DIR / "homeworks" / "tarea_4_mr" / "simulacion.py",
+}
+
+
+def parse_sizes(text: str) -> List[Tuple[int, float]]:
+    """Parse "2x0.05,4x0.25" into [(2, 0.05), (4, 0.25)] (stations x years)."""
+    sizes = []
+    for item in text.split(','):
+        stations, years = item.strip().lower().split('x')
+        stations, years = int(stations), float(years)
+        if not 1 <= stations <= len(synthetic_data.STATION_SHEETS):
+            raise ValueError(f"{item.strip()}: stations must be between 1 and {len(synthetic_data.STATION_SHEETS)}")
+        sizes.append((stations, years))
+    return sizes
+
+
+def size_label(stations: int, years: float) -> str:
+    return f"{stations}st x {years:g}y"
+
+
+class BenchmarkRunner:
+    """Collects timings for named benchmarks."""
+
+    def __init__(self, repeat: int = 3, only: Optional[List[str]] = None):
+        self.repeat = repeat
+        self.only = only
+        self.results: List[dict] = []
+
+    def selected(self, name: str) -> bool:
+        return not self.only or any(name.startswith(prefix) for prefix in self.only)
+
+    def group_selected(self, group: str) -> bool:
+        """True if any benchmark under `group` (e.g. "ingest") may run."""
+        return not self.only or any(p.startswith(group) or group.startswith(p) for p in self.only)
+
+    def run(self, name: str, fn: Callable, size: str = "-", repeat: Optional[int] = None):
+        """
+        Time `fn` and record the result.
+
+        Args:
+            name: Benchmark name (dotted, used by --only)
+            fn: Zero-argument callable to time
+            size: Data size label
+            repeat: Override the number of repetitions
+
+        Returns:
+            The value returned by the last call of `fn` (None if skipped)
+        """
+        if not self.selected(name):
+            return None
+
+        timings = []
+        value = None
+        for _ in range(repeat or self.repeat):
+            start = time.perf_counter()
+            value = fn()
+            timings.append(time.perf_counter() - start)
+
+        record = {
+            'name': name,
+            'size': size,
+            'repeat': len(timings),
+            'min_s': min(timings),
+            'median_s': statistics.median(timings),
+            'mean_s': statistics.fmean(timings),
+        }
+        if isinstance(value, pd.DataFrame):
+            record['rows'], record['cols'] = value.shape
+        self.results.append(record)
+        logger.info(f"{name} [{size}]: median {record['median_s']:.4f}s")
+        return value
+
+
+def bench_pipeline(runner: BenchmarkRunner, stations: int, years: float, workdir: Path):
+    """Ingestion, imputation and metric benchmarks for one data size."""
+    size = size_label(stations, years)
+    raw_dir = workdir / "raw"
+    processed_dir = workdir / "processed"
+
+    def step(name, fn):
+        # Later steps need the output even when this one is filtered out
+        return runner.run(name, fn, size) if runner.selected(name) else fn()
+
+    if runner.group_selected("ingest"):
+        logger.info(f"Generating synthetic workbooks ({size})...")
+        synthetic_data.write_workbooks(raw_dir, stations, years)
+
+        raw = {}
+        for key in process_datasets.PROCESSORS:
+            raw[key] = step(f"ingest.read.{key}", lambda: process_datasets.read_dataset(key, raw_dir))
+
+        processed = {}
+        for key, process in process_datasets.PROCESSORS.items():
+            processed[key] = step(f"ingest.process.{key}", lambda: process(raw[key]))
+
+        main_dataframe = step("ingest.concat", lambda: process_datasets.build_main_dataframe(processed))
+        runner.run("ingest.write", lambda: process_datasets.write_outputs(processed, main_dataframe, processed_dir), size)
+
+    if not (runner.group_selected("imputation") or runner.group_selected("metrics")):
+        return
+
+    panel = synthetic_data.synthetic_panel(stations, years)
+    long_df = air_quality.to_long(panel)
+
+    runner.run("imputation.nox", lambda: air_quality.impute_nox(panel), size)
+    runner.run("imputation.short_gaps", lambda: air_quality.impute_short_gaps(panel), size)
+
+    def max8h_all_stations():
+        o3 = long_df[long_df['pollutant'] == 'O3'].set_index('datetime').sort_index()
+        return o3.groupby('station')['value'].apply(air_quality.daily_max8h)
+
+    runner.run("metrics.max8h", max8h_all_stations, size)
+    runner.run("metrics.monthly_auc", lambda: air_quality.monthly_metrics(long_df), size)
+    runner.run("metrics.aqi", lambda: air_quality.daily_aqi(long_df), size)
+
+
+def bench_exports(runner: BenchmarkRunner, workdir: Path):
+    """Notebook export benchmarks (skipped when nbconvert is not installed)."""
+    if not runner.group_selected("export"):
+        return
+
+    export_logger = logging.getLogger(export_reports.__name__)
+    previous_level = export_logger.level
+    export_logger.setLevel(logging.WARNING)
+    try:
+        if not export_reports.check_dependencies()['nbconvert']:
+            logger.warning("nbconvert not available, skipping export benchmarks")
+            return
+
+        export_reports.EXPORTS_DIR = workdir / "exports"
+        export_reports.create_export_directory()
+        for notebook_file, output_name in export_reports.NOTEBOOK_ORDER:
+            notebook_path = CHALLENGE_DIR / "notebooks" / notebook_file
+            runner.run(f"export.notebook.{output_name}",
+                       lambda: export_reports.export_notebook(notebook_path, output_name, 'html'))
+    finally:
+        export_logger.setLevel(previous_level)
+
+
+def bench_simulations(runner: BenchmarkRunner, workdir: Path):
+    """Run the MA2004B simulation scripts as-is (non-interactive backend, output in a temp dir)."""
+    if not runner.group_selected("simulation"):
+        return
+
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    cwd, argv = os.getcwd(), sys.argv
+    os.chdir(workdir)
+    try:
+        for name, script in SIMULATIONS.items():
+            if not script.exists():
+                logger.warning(f"Simulation script not found: {script}")
+                continue
+
+            def run_script():
+                with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    runpy.run_path(str(script), run_name="__main__")
+                plt.close('all')
+
+            # Scripts with their own CLI must see their default arguments, not ours
+            sys.argv = [str(script)]
+            runner.run(name, run_script)
+    finally:
+        os.chdir(cwd)
+        sys.argv = argv
+
+
+def environment() -> dict:
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+    }
+
+
+def save_results(path: Path, results: List[dict], args):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        'environment': environment(),
+        'config': {'sizes': args.sizes, 'repeat': args.repeat, 'only': args.only},
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2)
+    logger.info(f"✓ Results saved: {path}")
+
+
+def compare(results: List[dict], baseline_path: Path, tolerance: float) -> int:
+    """
+    Compare best-of-N timings against a stored baseline (less noisy than the median).
+
+    Returns:
+        Number of benchmarks slower than the baseline by more than `tolerance`
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(r['name'], r['size']): r for r in json.load(f)['results']}
+
+    regressions = 0
+    logger.info(f"=== Comparison against {baseline_path.name} (tolerance {tolerance:.0%}) ===")
+    for r in results:
+        base = baseline.get((r['name'], r['size']))
+        if base is None:
+            logger.info(f"  {r['name']:<48} {r['size']:<14} (new)")
+            continue
+        ratio = r['min_s'] / base['min_s'] if base['min_s'] > 0 else float('inf')
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  ✗ REGRESSION"
+            regressions += 1
+        elif ratio < 1 - tolerance:
+            flag = "  ✓ faster"
+        logger.info(f"  {r['name']:<48} {r['size']:<14} {base['min_s']:.4f}s -> {r['min_s']:.4f}s  x{ratio:.2f}{flag}")
+
+    return regressions
+
+
+def print_summary(results: List[dict]):
+    logger.info("=== Benchmark Summary ===")
+    logger.info(f"  {'benchmark':<48} {'size':<14} {'median':>10} {'min':>10} {'rows':>10}")
+    for r in results:
+        rows = r.get('rows', '')
+        logger.info(f"  {r['name']:<48} {r['size']:<14} {r['median_s']:>9.4f}s {r['min_s']:>9.4f}s {rows:>10}")
+
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the air quality pipeline and simulations on synthetic data",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python benchmarks/run_benchmarks.py                          # Default sizes, all benchmarks
+  python benchmarks/run_benchmarks.py --sizes 8x1 --repeat 1   # 8 stations x 1 year per source
+  python benchmarks/run_benchmarks.py --only ingest,metrics    # Only some benchmark groups
+  python benchmarks/run_benchmarks.py --save-baseline local    # Store benchmarks/baselines/local.json
+  python benchmarks/run_benchmarks.py --compare local          # Fail if slower than the baseline
+        """
+    )
+
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help=f'Comma separated STATIONSxYEARS data sizes (default: {DEFAULT_SIZES})')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetitions per benchmark (default: 3)')
+    parser.add_argument('--only', help='Comma separated benchmark name prefixes to run')
+    parser.add_argument('--output', type=Path, help='Write the results to this JSON file')
+    parser.add_argument('--save-baseline', metavar='NAME', help='Store the results as baselines/NAME.json')
+    parser.add_argument('--compare', metavar='NAME', help='Compare the results against baselines/NAME.json')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed slowdown before flagging a regression (default: 0.25)')
+
+    args = parser.parse_args()
+    only = [p.strip() for p in args.only.split(',')] if args.only else None
+    try:
+        sizes = parse_sizes(args.sizes)
+    except ValueError as e:
+        parser.error(f"--sizes {e}")
+
+    baseline_path = BASELINES_DIR / f"{args.compare}.json" if args.compare else None
+    if baseline_path and not baseline_path.exists():
+        logger.error(f"Baseline not found: {baseline_path} (save one first with --save-baseline {args.compare})")
+        sys.exit(1)
+
+    runner = BenchmarkRunner(repeat=args.repeat, only=only)
+
+    logger.info("=== Air Quality Pipeline Benchmarks ===")
+    with tempfile.TemporaryDirectory(prefix="aq_bench_") as tmp:
+        tmp = Path(tmp)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            for stations, years in sizes:
+                bench_pipeline(runner, stations, years, tmp / f"{stations}x{years:g}")
+        bench_exports(runner, tmp)
+        bench_simulations(runner, tmp)
+
+    print_summary(runner.results)
+
+    if args.output:
+        save_results(args.output, runner.results, args)
+    if args.save_baseline:
+        save_results(BASELINES_DIR / f"{args.save_baseline}.json", runner.results, args)
+
+    if baseline_path:
+        regressions = compare(runner.results, baseline_path, args.tolerance)
+        if regressions:
+            logger.warning(f"{regressions} benchmark(s) regressed beyond {args.tolerance:.0%}")
+            sys.exit(1)
+        logger.info("✓ No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""
+Synthetic air quality workbooks for benchmarking
+
+The real inputs in data/raw and data/processed are Git LFS pointers, so the benchmarks
+generate workbooks that mimic the layout of each of the five SIMA sources instead:
+
+    1. 2020-2021: one sheet per station, named after the station (e.g. "SURESTE",
+       "NOROESTE 2"), with 'date' and the parameter codes as columns.
+    2. 2022-2023: same layout as dataset 1.
+    3. 2023-2024: a single headerless sheet 'Param_horarios_Estaciones'; row 0 holds the
+       station names, row 1 the parameter codes (WDV instead of WDR), row 2 the units,
+       and the data starts at row 3 with day-first date strings in the first column.
+    4. 2024: one sheet per station code (e.g. "SE"), with a 'Fecha' column and verbose
+       column names such as "NO2 (ppb)".
+    5. 2025: one sheet per station code, with a units row right below the header.
+
+Hourly values follow a daily cycle plus log-normal noise, with NaN gaps of different
+lengths and -9999 sentinels mixed in, as in the real files.
+
+Usage:
+    python benchmarks/synthetic_data.py --out /tmp/raw --stations 4 --years 0.25
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+from process_datasets import RAW_FILES  # noqa: E402
+
+SENTINEL = -9999
+
+# Station code -> sheet name used by datasets 1 and 2
+STATION_SHEETS = {
+    'SE': 'SURESTE',
+    'NE': 'NORESTE',
+    'CE': 'CENTRO',
+    'NO': 'NOROESTE',
+    'SO': 'SUROESTE',
+    'NO2': 'NOROESTE 2',
+    'NTE': 'NORTE',
+    'NE2': 'NORESTE 2',
+    'SE2': 'SURESTE 2',
+    'SO2': 'SUROESTE 2',
+    'SUR': 'SUR',
+    'NTE2': 'NORTE 2',
+    'SE3': 'SURESTE 3',
+    'NE3': 'NORESTE 3',
+    'NO3': 'NOROESTE 3',
+}
+
+# Parameter -> (unit, base level, daily amplitude, noise sigma, phase hour of the peak)
+PARAMETERS = {
+    'CO': ('ppm', 1.2, 0.5, 0.35, 8),
+    'NO': ('ppb', 10.0, 6.0, 0.6, 7),
+    'NO2': ('ppb', 20.0, 8.0, 0.4, 8),
+    'NOX': ('ppb', 30.0, 12.0, 0.4, 8),
+    'O3': ('ppb', 30.0, 20.0, 0.35, 15),
+    'PM10': ('ug/m3', 50.0, 15.0, 0.45, 9),
+    'PM2.5': ('ug/m3', 20.0, 6.0, 0.45, 9),
+    'SO2': ('ppb', 5.0, 1.5, 0.5, 11),
+    'TOUT': ('degC', 22.0, 6.0, 0.05, 15),
+    'RH': ('%', 60.0, 15.0, 0.1, 5),
+    'SR': ('kW/m2', 0.3, 0.3, 0.2, 13),
+    'RAINF': ('mm/Hr', 0.0, 0.0, 0.0, 0),
+    'PRS': ('mmHg', 712.0, 1.5, 0.002, 10),
+    'WSR': ('km/hr', 8.0, 4.0, 0.3, 16),
+    'WDR': ('deg', 180.0, 0.0, 0.0, 0),
+}
+
+SOURCE_START_YEARS = {
+    '2020_2021': 2020,
+    '2022_2023': 2022,
+    '2023_2024': 2023,
+    '2024': 2024,
+    '2025': 2025,
+}
+
+
+def station_codes(stations: int) -> List[str]:
+    """The first `stations` station codes, in label order."""
+    if not 1 <= stations <= len(STATION_SHEETS):
+        raise ValueError(f"stations must be between 1 and {len(STATION_SHEETS)}, got {stations}")
+    return list(STATION_SHEETS)[:stations]
+
+
+def hourly_index(start_year: int, years: float) -> pd.DatetimeIndex:
+    """Hourly timestamps covering `years` years from January 1st of `start_year`."""
+    periods = max(int(round(years * 365 * 24)), 24)
+    return pd.date_range(f"{start_year}-01-01", periods=periods, freq="h")
+
+
+def _gap_mask(n: int, rng: np.random.Generator) -> np.ndarray:
+    """Missing-value mask with many short gaps, some medium ones and a rare long outage."""
+    mask = np.zeros(n, dtype=bool)
+    for count, mean_len in ((n // 300, 3), (n // 2000, 24), (n // 8000, 120)):
+        starts = rng.integers(0, n, size=count)
+        lengths = rng.geometric(1.0 / mean_len, size=count)
+        for start, length in zip(starts, lengths):
+            mask[start:start + length] = True
+    return mask
+
+
+def station_values(index: pd.DatetimeIndex, rng: np.random.Generator,
+                   sentinel_rate: float = 0.01) -> Dict[str, np.ndarray]:
+    """
+    Hourly values of every parameter for one station.
+
+    Args:
+        index: Hourly timestamps
+        rng: Random generator
+        sentinel_rate: Fraction of values replaced by the -9999 sentinel
+
+    Returns:
+        Mapping parameter -> float array (with NaN gaps and sentinels)
+    """
+    n = len(index)
+    hours = index.hour.to_numpy()
+    values = {}
+
+    for code, (_, level, amplitude, sigma, peak) in PARAMETERS.items():
+        cycle = level + amplitude * np.cos(2 * np.pi * (hours - peak) / 24)
+        if code == 'RAINF':
+            v = np.where(rng.random(n) < 0.03, rng.exponential(2.0, n), 0.0)
+        elif code == 'WDR':
+            v = rng.uniform(0, 360, n)
+        else:
+            v = np.clip(cycle, 0, None) * rng.lognormal(0.0, sigma, n)
+        values[code] = np.round(v, 3)
+
+    # NOX is measured, but should stay close to NO + NO2
+    values['NOX'] = np.round((values['NO'] + values['NO2']) * rng.lognormal(0.0, 0.05, n), 3)
+
+    for code, v in values.items():
+        v[_gap_mask(n, rng)] = np.nan
+        v[rng.random(n) < sentinel_rate] = SENTINEL
+
+    return values
+
+
+def _station_frame(index, rng, date_column='date') -> pd.DataFrame:
+    frame = pd.DataFrame(station_values(index, rng))
+    frame.insert(0, date_column, index)
+    return frame
+
+
+def sheets_by_station_name(stations: List[str], index, rng, include_skipped=False) -> Dict[str, pd.DataFrame]:
+    """Datasets 1 and 2: one sheet per station, named after the station."""
+    sheets = {STATION_SHEETS[code]: _station_frame(index, rng) for code in stations}
+    if include_skipped:
+        # Dataset 1 ships an extra NOROESTE3 sheet that the pipeline ignores
+        sheets['NOROESTE3'] = _station_frame(index, rng)
+    return sheets
+
+
+def wide_parameter_sheet(stations: List[str], index, rng) -> pd.DataFrame:
+    """Dataset 3: one wide sheet with station / parameter / unit header rows."""
+    header_station, header_param, header_unit = [None], [None], [None]
+    columns = [index.strftime("%d/%m/%Y %H:%M").tolist()]
+
+    for code in stations:
+        values = station_values(index, rng)
+        for param, v in values.items():
+            header_station.append(STATION_SHEETS[code].title())
+            header_param.append('WDV' if param == 'WDR' else param)
+            header_unit.append(PARAMETERS[param][0])
+            columns.append(v.tolist())
+
+    header = pd.DataFrame([header_station, header_param, header_unit])
+    body = pd.DataFrame(list(zip(*columns)))
+    return pd.concat([header, body], ignore_index=True)
+
+
+def sheets_by_station_code_verbose(stations: List[str], index, rng) -> Dict[str, pd.DataFrame]:
+    """Dataset 4: one sheet per station code, 'Fecha' plus verbose parameter names."""
+    sheets = {}
+    for code in stations:
+        frame = _station_frame(index, rng, date_column='Fecha')
+        frame = frame.rename(columns={
+            param: f"{param} ({PARAMETERS[param][0]})" for param in PARAMETERS
+        })
+        sheets[code] = frame
+    return sheets
+
+
+def sheets_by_station_code_units(stations: List[str], index, rng) -> Dict[str, pd.DataFrame]:
+    """Dataset 5: one sheet per station code, units row right below the header."""
+    sheets = {}
+    for code in stations:
+        frame = _station_frame(index, rng).astype(object)
+        units = pd.DataFrame([{'date': None, **{p: PARAMETERS[p][0] for p in PARAMETERS}}])
+        sheets[code] = pd.concat([units, frame], ignore_index=True)
+    return sheets
+
+
+def generate_sources(stations: int = 4, years: float = 0.25, seed: int = 0) -> Dict[str, object]:
+    """
+    Build the five raw sources in memory.
+
+    Args:
+        stations: Number of stations per source (taken in label order)
+        years: Span of each source in years
+        seed: Random seed
+
+    Returns:
+        Mapping source key -> dict of sheets (or a single frame for dataset 3)
+    """
+    rng = np.random.default_rng(seed)
+    codes = station_codes(stations)
+
+    def index(key):
+        return hourly_index(SOURCE_START_YEARS[key], years)
+
+    return {
+        '2020_2021': sheets_by_station_name(codes, index('2020_2021'), rng, include_skipped=True),
+        '2022_2023': sheets_by_station_name(codes, index('2022_2023'), rng),
+        '2023_2024': wide_parameter_sheet(codes, index('2023_2024'), rng),
+        '2024': sheets_by_station_code_verbose(codes, index('2024'), rng),
+        '2025': sheets_by_station_code_units(codes, index('2025'), rng),
+    }
+
+
+def write_workbooks(out_dir, stations: int = 4, years: float = 0.25, seed: int = 0) -> Dict[str, Path]:
+    """
+    Write the five synthetic workbooks with the same file names as data/raw.
+
+    Returns:
+        Mapping source key -> written path
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = {}
+
+    for key, content in generate_sources(stations, years, seed).items():
+        path = out_dir / RAW_FILES[key]
+        with pd.ExcelWriter(path, engine="openpyxl") as writer:
+            if key == '2023_2024':
+                content.to_excel(writer, sheet_name='Param_horarios_Estaciones', header=False, index=False)
+            else:
+                for sheet_name, frame in content.items():
+                    frame.to_excel(writer, sheet_name=sheet_name, index=False)
+        written[key] = path
+
+    return written
+
+
+def synthetic_panel(stations: int = 4, years: float = 0.25, seed: int = 0,
+                    start_years: Optional[List[int]] = None) -> pd.DataFrame:
+    """
+    Hourly panel shaped like panel_*_AB_v1.csv / pre_imputation_subset_enriched_v1.csv.
+
+    Columns: date, station_code, period, period_window and the pollutant columns
+    (PM2.5, NO2, CO, O3, NO, NOX, NOX_final). Sentinels are already replaced by NaN.
+    """
+    rng = np.random.default_rng(seed)
+    codes = station_codes(stations)
+    frames = []
+
+    for year in start_years or [2020, 2024, 2025]:
+        index = hourly_index(year, years)
+        for code in codes:
+            values = station_values(index, rng, sentinel_rate=0.0)
+            frame = pd.DataFrame({k: values[k] for k in ['PM2.5', 'NO2', 'CO', 'O3', 'NO', 'NOX']})
+            frame.insert(0, 'station_code', code)
+            frame.insert(0, 'date', index)
+            frames.append(frame)
+
+    panel = pd.concat(frames, ignore_index=True)
+    panel['NOX_final'] = panel['NOX'].fillna(panel['NO'] + panel['NO2'])
+    yr = panel['date'].dt.year
+    panel['period'] = np.select([yr.isin([2020, 2021]), yr.isin([2023, 2024, 2025])],
+                                ['pandemic', 'current'], default='transition')
+    panel['period_window'] = yr.map({2020: 'pandemic_JanJul2020',
+                                     2024: 'baseline_JanJul2024',
+                                     2025: 'current_JanJul2025'}).fillna('other')
+    return panel
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic raw air quality workbooks")
+    parser.add_argument('--out', type=Path, required=True, help='Output directory')
+    parser.add_argument('--stations', type=int, default=4, help='Stations per source (default: 4)')
+    parser.add_argument('--years', type=float, default=0.25, help='Years covered by each source (default: 0.25)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    args = parser.parse_args()
+
+    for key, path in write_workbooks(args.out, args.stations, args.years, args.seed).items():
+        print(f"{key}: {path}")
+
+
+if __name__ == "__main__":
+    main()
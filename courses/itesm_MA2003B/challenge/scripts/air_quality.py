@@ -0,0 +1,325 @@
+"""
+Air quality metrics shared by the notebooks
+
+Hourly panel -> long format, monthly metrics (AUC, mean, p50, p90, daily max),
+daily IAQI/AQI following the US EPA rules, and the NOX / short-gap imputation steps.
+The notebooks import them instead of keeping their own copies: cuantitative_analysis.ipynb
+(monthly_metrics, daily_aqi), statistical_analysis.ipynb (daily_max8h) and
+data_imputation.ipynb (impute_nox, impute_short_gaps). The benchmarks and the AQI
+service time and serve that same code.
+
+Conventions (see the notebooks for the full discussion):
+    - Base frequency is 1 hour; series are re-sampled to 1H when needed.
+    - Rolling/daily windows need 75% valid data (>= 6 of 8 hours, >= 18 of 24 hours).
+    - O3 is converted from ppb to ppm before computing its IAQI.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+POLLUTANT_COLS = ['PM2.5', 'NO2', 'CO', 'O3', 'NO', 'NOX_final']
+
+# Breakpoints EPA: (C_low, C_high, I_low, I_high)
+PM25_BREAKPOINTS = [
+    (0.0, 12.0, 0, 50),
+    (12.1, 35.4, 51, 100),
+    (35.5, 55.4, 101, 150),
+    (55.5, 150.4, 151, 200),
+    (150.5, 250.4, 201, 300),
+    (250.5, 350.4, 301, 400),
+    (350.5, 500.4, 401, 500),
+]
+
+O3_8H_BREAKPOINTS = [
+    (0.000, 0.054, 0, 50),
+    (0.055, 0.070, 51, 100),
+    (0.071, 0.085, 101, 150),
+    (0.086, 0.105, 151, 200),
+    (0.106, 0.200, 201, 300),
+]
+
+CO_8H_BREAKPOINTS = [
+    (0.0, 4.4, 0, 50),
+    (4.5, 9.4, 51, 100),
+    (9.5, 12.4, 101, 150),
+    (12.5, 15.4, 151, 200),
+    (15.5, 30.4, 201, 300),
+    (30.5, 40.4, 301, 400),
+    (40.5, 50.4, 401, 500),
+]
+
+NO2_1H_BREAKPOINTS = [
+    (0, 53, 0, 50),
+    (54, 100, 51, 100),
+    (101, 360, 101, 150),
+    (361, 649, 151, 200),
+    (650, 1249, 201, 300),
+    (1250, 1649, 301, 400),
+    (1650, 2049, 401, 500),
+]
+
+IAQI_COLS = ['iaqi_pm25', 'iaqi_o3', 'iaqi_co', 'iaqi_no2']
+
+# Categorías EPA: (AQI máximo, etiqueta)
+AQI_CATEGORIES = [
+    (50, 'Good'),
+    (100, 'Moderate'),
+    (150, 'Unhealthy for Sensitive Groups'),
+    (200, 'Unhealthy'),
+    (300, 'Very Unhealthy'),
+    (float('inf'), 'Hazardous'),
+]
+
+
+def truncate(x, decimals):
+    factor = 10 ** decimals
+    return np.floor(x * factor) / factor
+
+
+def iaqi_from_bp(c, bps):
+    """Linear interpolation of a concentration inside its EPA breakpoint row."""
+    if pd.isna(c):
+        return np.nan
+    for Clow, Chigh, Ilow, Ihigh in bps:
+        if c <= Chigh:
+            return (Ihigh - Ilow) / (Chigh - Clow) * (c - Clow) + Ilow
+    Clow, Chigh, Ilow, Ihigh = bps[-1]
+    return (Ihigh - Ilow) / (Chigh - Clow) * (c - Clow) + Ilow
+
+
+def aqi_category(aqi) -> Optional[str]:
+    """EPA category of an AQI value (None if missing)."""
+    if pd.isna(aqi):
+        return None
+    for upper, label in AQI_CATEGORIES:
+        if aqi <= upper:
+            return label
+
+
+def to_long(df: pd.DataFrame, pollutant_cols: Sequence[str] = POLLUTANT_COLS) -> pd.DataFrame:
+    """Convert the panel to long format: datetime, station, pollutant, value (NaN values dropped)."""
+    present = [c for c in pollutant_cols if c in df.columns]
+
+    long_df = (
+        df.rename(columns={'date': 'datetime', 'station_code': 'station'})
+          .melt(id_vars=['datetime', 'station'],
+                value_vars=present,
+                var_name='pollutant',
+                value_name='value')
+    )
+
+    return long_df.dropna(subset=['value'])
+
+
+def daily_max8h(s: pd.Series, min_periods: int = 6, decimals: Optional[int] = None) -> pd.Series:
+    """
+    Daily maximum of the 8-hour rolling mean of an hourly series.
+
+    Args:
+        s: Series indexed by datetime
+        min_periods: Valid hours required in each 8-hour window
+        decimals: Truncate the rolling means to this many decimals (EPA rule), if given
+
+    Returns:
+        Series indexed by day
+    """
+    m8 = s.asfreq('1H').rolling(window=8, min_periods=min_periods).mean()
+    if decimals is not None:
+        m8 = truncate(m8, decimals)
+    return m8.resample('1D').max()
+
+
+def _monthly_metrics(g):
+    s = g.set_index('datetime').sort_index().asfreq('1H')
+    v = s['value']
+    valid_hours = int(v.notna().sum())
+    m = v.notna() & v.shift(-1).notna()
+    auc = float((0.5 * (v[m] + v.shift(-1)[m])).sum())
+    mean_monthly = (auc / valid_hours) if valid_hours > 0 else np.nan
+    arr = v.to_numpy()
+    p50 = float(np.nanpercentile(arr, 50)) if valid_hours > 0 else np.nan
+    p90 = float(np.nanpercentile(arr, 90)) if valid_hours > 0 else np.nan
+    daily_max = s['value'].resample('1D').max(min_count=1)
+    max_diario = float(daily_max.max()) if daily_max.notna().any() else np.nan
+    return pd.Series({
+        'auc': auc,
+        'mean': mean_monthly,
+        'p50': p50,
+        'p90': p90,
+        'max_diario': max_diario,
+        'valid_hours': valid_hours,
+    })
+
+
+def monthly_metrics(long_df: pd.DataFrame) -> pd.DataFrame:
+    """Monthly metrics per station and pollutant (AUC by trapezoid rule with a 1h step)."""
+    ldf = long_df.copy()
+    ldf['datetime'] = pd.to_datetime(ldf['datetime'])
+    ldf['month'] = ldf['datetime'].dt.to_period('M').dt.to_timestamp()
+
+    return (
+        ldf.groupby(['station', 'pollutant', 'month'], as_index=False)
+           .apply(_monthly_metrics)
+           .reset_index(drop=True)
+    )
+
+
+def _daily_iaqi_frame(ldf, pollutant, column, daily_conc):
+    """Apply `daily_conc` to each station's hourly series and map the result to IAQI."""
+    results = []
+    sub = ldf[ldf['pollutant'] == pollutant]
+    for station, g in sub.groupby('station'):
+        conc, bps = daily_conc(g['value'].asfreq('1H'))
+        iaqi = conc.apply(lambda x: iaqi_from_bp(x, bps)).round(0)
+        results.append(pd.DataFrame({
+            'station': station,
+            'date': conc.index,
+            column: iaqi
+        }))
+    return pd.concat(results, ignore_index=True) if results else pd.DataFrame(columns=['station', 'date', column])
+
+
+def _pm25_24h(s) -> Tuple[pd.Series, list]:
+    # Promedio diario 24h, requiere >= 18 horas válidas (75%)
+    daily_count = s.resample('1D').count()
+    daily_mean = s.resample('1D').mean().where(daily_count >= 18)
+    return truncate(daily_mean, 1), PM25_BREAKPOINTS
+
+
+def _o3_8h(s) -> Tuple[pd.Series, list]:
+    # ppb -> ppm, máximo diario de medias móviles 8h
+    return daily_max8h(s / 1000.0, decimals=3), O3_8H_BREAKPOINTS
+
+
+def _co_8h(s) -> Tuple[pd.Series, list]:
+    # ppm truncado a 0.1
+    return daily_max8h(s, decimals=1), CO_8H_BREAKPOINTS
+
+
+def _no2_1h(s) -> Tuple[pd.Series, list]:
+    # Máximo diario 1h, requiere >= 18 horas válidas en el día (ppb truncado a entero)
+    daily_count = s.resample('1D').count()
+    max_1h = s.resample('1D').max().where(daily_count >= 18)
+    return truncate(max_1h, 0), NO2_1H_BREAKPOINTS
+
+
+IAQI_RULES = [
+    ('PM2.5', 'iaqi_pm25', _pm25_24h),
+    ('O3', 'iaqi_o3', _o3_8h),
+    ('CO', 'iaqi_co', _co_8h),
+    ('NO2', 'iaqi_no2', _no2_1h),
+]
+
+
+def daily_aqi(long_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Daily IAQI per station and pollutant, and the daily AQI as the maximum IAQI available.
+
+    Args:
+        long_df: Long-format frame with datetime, station, pollutant, value
+
+    Returns:
+        DataFrame with station, date, iaqi_pm25, iaqi_o3, iaqi_co, iaqi_no2, aqi
+    """
+    ldf = long_df.copy()
+    ldf['datetime'] = pd.to_datetime(ldf['datetime'])
+    ldf = ldf.set_index('datetime').sort_index()
+
+    aqi = None
+    for pollutant, column, daily_conc in IAQI_RULES:
+        frame = _daily_iaqi_frame(ldf, pollutant, column, daily_conc)
+        aqi = frame if aqi is None else aqi.merge(frame, on=['station', 'date'], how='outer')
+
+    aqi['aqi'] = aqi[IAQI_COLS].max(axis=1, skipna=True)
+    return aqi.sort_values(['station', 'date']).reset_index(drop=True)
+
+
+def impute_nox(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add NOX_final (measured NOX, filled with NO + NO2 only when NOX is missing) and NOX_source.
+
+    Returns:
+        A copy of `df` with the NOX_final and NOX_source columns
+    """
+    sub = df.copy()
+    nox_sum = sub['NO'] + sub['NO2']
+    has_parts = sub['NO'].notna() & sub['NO2'].notna()
+
+    sub['NOX_final'] = sub['NOX'] if 'NOX' in sub.columns else np.nan
+    measured = sub['NOX'].notna() if 'NOX' in sub.columns else pd.Series(False, index=sub.index)
+    fill_mask = ~measured & has_parts
+    sub.loc[fill_mask, 'NOX_final'] = nox_sum[fill_mask]
+
+    sub['NOX_source'] = np.where(measured, 'measured', np.where(has_parts, 'sum_NO_NO2', 'nan'))
+    return sub
+
+
+def impute_short_A(g: pd.DataFrame, short_max: int = 6) -> pd.DataFrame:
+    """
+    Method A: fill gaps of at most `short_max` hours with the observed median of the same
+    (month, hour), falling back to the hour median and then the group median.
+    """
+    # Time index complete in the group's range
+    idx = pd.date_range(g["date"].min(), g["date"].max(), freq="H")
+    s = g.set_index("date")["value"].reindex(idx)
+
+    # Stational templates from OBSERVED values in the same group
+    obs = g.dropna().copy()
+    if obs.empty:
+        out = pd.DataFrame({"date": idx, "value_A": s.values, "A_imputed": np.zeros(len(s), bool)})
+    else:
+        obs["hour"] = obs["date"].dt.hour
+        obs["month"] = obs["date"].dt.month
+        templ_mh = obs.groupby(["month", "hour"])["value"].median()     # mes × hora
+        templ_h = obs.groupby("hour")["value"].median()                 # solo hora
+        med_all = float(obs["value"].median())
+
+        # Identify NaN blocks and mark ONLY short gaps
+        isna = s.isna()
+        block_id = (isna != isna.shift()).cumsum()
+        block_len = block_id.groupby(block_id).transform("size")
+        gap_len = block_len.where(isna, 0)
+        short_mask = gap_len.gt(0) & gap_len.le(short_max)
+
+        filled = s.copy()
+        if short_mask.any():
+            di = pd.DatetimeIndex(idx)
+            mm = di.month
+            hh = di.hour
+
+            # Lookup con fallback: (mes,hora) -> hora -> mediana global
+            def pick_val(m, h):
+                v = templ_mh.get((m, h), np.nan)
+                if pd.isna(v):
+                    v = templ_h.get(h, np.nan)
+                if pd.isna(v):
+                    v = med_all
+                return float(v)
+
+            vals = [pick_val(m, h) for m, h in zip(mm[short_mask], hh[short_mask])]
+            filled.loc[short_mask] = vals
+
+        out = pd.DataFrame({
+            "date": idx,
+            "value_A": filled.values,
+            "A_imputed": short_mask.values
+        })
+
+    # labels for merging back
+    out["station_code"] = g["station_code"].iloc[0]
+    out["pollutant"] = g["pollutant"].iloc[0]
+    out["period"] = g["period"].iloc[0]
+    return out
+
+
+def impute_short_gaps(df: pd.DataFrame, value_cols: List[str] = POLLUTANT_COLS, short_max: int = 6) -> pd.DataFrame:
+    """Apply method A to every (station_code, pollutant, period) group of the panel."""
+    long0 = (df[["station_code", "date", "period"] + value_cols]
+             .melt(id_vars=["station_code", "date", "period"],
+                   var_name="pollutant", value_name="value"))
+
+    return (long0
+            .groupby(["station_code", "pollutant", "period"], group_keys=False)
+            .apply(lambda g: impute_short_A(g, short_max)))
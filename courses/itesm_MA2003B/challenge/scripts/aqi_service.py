@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Local AQI Query Service
+
+Serves daily AQI, the IAQI breakdown, daily max-8h and monthly metrics by station,
+pollutant and date range, from the processed panel. Everything is computed once at
+startup with the same functions as cuantitative_analysis.ipynb (scripts/air_quality.py)
+and stored per day in date order, so a query is a binary search plus a slice. Recent
+results are also kept in an LRU cache, so repeated dashboard queries skip even that.
+
+The city series follow the notebooks: city AQI/IAQI is the maximum across stations per
+day, city max-8h is the mean across stations per day and each city monthly metric is the
+median across stations per month.
+
+Usage (from the challenge directory):
+    python scripts/aqi_service.py query aqi --station CITY --start 2024-01-01 --end 2024-01-31
+    python scripts/aqi_service.py query max8h --station SE --pollutant O3
+    python scripts/aqi_service.py serve [--host 127.0.0.1] [--port 8000]
+
+HTTP endpoints (GET, JSON):
+    /stations
+    /aqi?station=SE&start=2024-01-01&end=2024-01-31
+    /iaqi?station=CITY&start=2024-01-01
+    /max8h?station=SE&pollutant=O3&start=2024-01-01&end=2024-07-31
+    /monthly?station=SE&pollutant=PM2.5&start=2024-01&end=2024-07
+    /monthly?station=CITY&pollutant=O3
+    /health
+"""
+
+import argparse
+import json
+import logging
+import sys
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from air_quality import IAQI_COLS, POLLUTANT_COLS, aqi_category, daily_aqi, daily_max8h, monthly_metrics, to_long
+from frame_cache import CACHE
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PANEL_FILE = Path("data/processed/panel_BALANCED_MAIN_JanJul_2020_2024_2025_AB_v1.csv")
+CITY = "CITY"
+QUERY_KINDS = ('aqi', 'iaqi', 'max8h', 'monthly')
+DEFAULT_CACHE_SIZE = 4096
+
+
+def _date_key(value: Optional[str], key_format: str) -> Optional[str]:
+    """Parse a date bound and format it like the table keys ('%Y-%m-%d' or '%Y-%m')."""
+    if value is None:
+        return None
+    try:
+        ts = pd.Timestamp(value)
+    except (ValueError, TypeError):
+        ts = pd.NaT
+    if pd.isna(ts):
+        raise ValueError(f"Invalid date '{value}', expected YYYY-MM-DD")
+    return ts.strftime(key_format)
+
+
+def _records(frame: pd.DataFrame) -> List[dict]:
+    """DataFrame -> list of JSON-ready dicts (NaN -> None)."""
+    frame = frame.astype(object).where(frame.notna(), None)
+    return frame.to_dict('records')
+
+
+class DailyIndex:
+    """Rows of one series sorted by their ISO date key, sliced by binary search."""
+
+    def __init__(self, keys: List[str], rows: List[dict]):
+        self.keys = keys
+        self.rows = rows
+
+    def between(self, start: Optional[str], end: Optional[str]) -> List[dict]:
+        lo = bisect_left(self.keys, start) if start else 0
+        hi = bisect_right(self.keys, end) if end else len(self.keys)
+        return self.rows[lo:hi]
+
+
+def _index_by(frame: pd.DataFrame, group_cols: List[str], key_col: str) -> Dict[tuple, DailyIndex]:
+    index = {}
+    for key, g in frame.sort_values(key_col).groupby(group_cols, sort=False):
+        key = key if isinstance(key, tuple) else (key,)
+        rows = _records(g.drop(columns=group_cols))
+        index[key] = DailyIndex([r[key_col] for r in rows], rows)
+    return index
+
+
+class AQIStore:
+    """Precomputed daily tables of the panel, queryable by station, pollutant and date range."""
+
+    def __init__(self, panel: pd.DataFrame, cache_size: int = DEFAULT_CACHE_SIZE):
+        """
+        Args:
+            panel: Hourly panel with date, station_code and the pollutant columns
+            cache_size: Number of query results kept in the LRU cache
+        """
+        long_df = to_long(panel)
+        self.pollutants = [p for p in POLLUTANT_COLS if p in panel.columns]
+
+        # AQI and IAQI per station and day, plus the city (max across stations)
+        aqi = daily_aqi(long_df)
+        city = aqi.groupby('date')[IAQI_COLS + ['aqi']].max().reset_index()
+        city['station'] = CITY
+        aqi = pd.concat([aqi, city], ignore_index=True)
+        # Days between the data windows have no IAQI at all, keep only days with a value
+        aqi = aqi.dropna(subset=IAQI_COLS + ['aqi'], how='all')
+        aqi['category'] = aqi['aqi'].map(aqi_category)
+        aqi['date'] = aqi['date'].dt.strftime('%Y-%m-%d')
+        self._aqi = _index_by(aqi[['station', 'date', 'aqi', 'category']], ['station'], 'date')
+        self._iaqi = _index_by(aqi[['station', 'date'] + IAQI_COLS + ['aqi']], ['station'], 'date')
+
+        # Daily max-8h per station and pollutant, plus the city (mean across stations)
+        hourly = long_df.set_index('datetime').sort_index()
+        max8h = (hourly.groupby(['station', 'pollutant'])['value']
+                       .apply(daily_max8h)
+                       .rename('max8h')
+                       .reset_index()
+                       .rename(columns={'datetime': 'date'}))
+        city_max8h = max8h.groupby(['pollutant', 'date'])['max8h'].mean().reset_index()
+        city_max8h['station'] = CITY
+        max8h = pd.concat([max8h, city_max8h], ignore_index=True).dropna(subset=['max8h'])
+        max8h['date'] = max8h['date'].dt.strftime('%Y-%m-%d')
+        self._max8h = _index_by(max8h, ['station', 'pollutant'], 'date')
+
+        # Monthly metrics per station and pollutant, plus the city (median across stations)
+        monthly = monthly_metrics(long_df)
+        metric_cols = [c for c in monthly.columns if c not in ('station', 'pollutant', 'month')]
+        city_monthly = monthly.groupby(['pollutant', 'month'])[metric_cols].median().reset_index()
+        city_monthly['station'] = CITY
+        monthly = pd.concat([monthly, city_monthly], ignore_index=True)
+        monthly['month'] = monthly['month'].dt.strftime('%Y-%m')
+        self._monthly = _index_by(monthly, ['station', 'pollutant'], 'month')
+
+        self.stations = sorted({key[0] for key in self._aqi} | {key[0] for key in self._max8h})
+        self._cached_query = lru_cache(maxsize=cache_size)(self._query)
+
+    @classmethod
+    def from_csv(cls, path=PANEL_FILE, cache_size: int = DEFAULT_CACHE_SIZE) -> "AQIStore":
+        return cls(CACHE.load_csv(path), cache_size)
+
+    def query(self, kind: str, station: str, pollutant: Optional[str] = None,
+              start: Optional[str] = None, end: Optional[str] = None) -> Tuple[dict, ...]:
+        """
+        Rows of one precomputed table.
+
+        Args:
+            kind: 'aqi', 'iaqi', 'max8h' or 'monthly'
+            station: Station code, or CITY for the city series
+            pollutant: Pollutant column (required for max8h and monthly)
+            start: First day (any date pandas parses, e.g. 2024-01-03 or 2024-1-3), inclusive
+            end: Last day, inclusive; monthly queries use the month of start and end
+
+        Returns:
+            Tuple of row dicts, shared with the cache (do not mutate)
+
+        Raises:
+            ValueError: Unknown kind, station or pollutant, invalid date or start after end
+        """
+        key_format = '%Y-%m' if kind == 'monthly' else '%Y-%m-%d'
+        start, end = _date_key(start, key_format), _date_key(end, key_format)
+        if start and end and start > end:
+            raise ValueError(f"start ({start}) is after end ({end})")
+        return self._cached_query(kind, station, pollutant, start, end)
+
+    def _query(self, kind: str, station: str, pollutant: Optional[str],
+               start: Optional[str], end: Optional[str]) -> Tuple[dict, ...]:
+        """Rows of one table, with start and end already normalised to the table's key format."""
+        if kind not in QUERY_KINDS:
+            raise ValueError(f"Unknown query '{kind}', expected one of {', '.join(QUERY_KINDS)}")
+        if station not in self.stations:
+            raise ValueError(f"Unknown station '{station}'")
+
+        if kind in ('aqi', 'iaqi'):
+            table, key = (self._aqi if kind == 'aqi' else self._iaqi), (station,)
+        else:
+            if pollutant not in self.pollutants:
+                raise ValueError(f"Unknown pollutant '{pollutant}', expected one of {', '.join(self.pollutants)}")
+            table, key = (self._max8h if kind == 'max8h' else self._monthly), (station, pollutant)
+
+        index = table.get(key)
+        return tuple(index.between(start, end)) if index else ()
+
+    def cache_info(self) -> dict:
+        return self._cached_query.cache_info()._asdict()
+
+
+def make_handler(store: AQIStore):
+    """Build a request handler bound to `store`; encoded responses are LRU-cached too."""
+
+    @lru_cache(maxsize=DEFAULT_CACHE_SIZE)
+    def encoded(kind, station, pollutant, start, end) -> bytes:
+        rows = store.query(kind, station, pollutant, start, end)
+        return json.dumps({'query': kind, 'station': station, 'pollutant': pollutant,
+                           'start': start, 'end': end, 'count': len(rows), 'rows': rows}).encode('utf-8')
+
+    class AQIRequestHandler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: bytes):
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _error(self, status: int, message: str):
+            self._send(status, json.dumps({'error': message}).encode('utf-8'))
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            route = url.path.strip('/')
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+            if route == 'stations':
+                return self._send(200, json.dumps({'stations': store.stations,
+                                                   'pollutants': store.pollutants}).encode('utf-8'))
+            if route == 'health':
+                return self._send(200, json.dumps({'status': 'ok', 'query_cache': store.cache_info(),
+                                                   'response_cache': encoded.cache_info()._asdict()}).encode('utf-8'))
+            if route not in QUERY_KINDS:
+                return self._error(404, f"Unknown endpoint '/{route}'")
+
+            try:
+                body = encoded(route, params.get('station', CITY), params.get('pollutant'),
+                               params.get('start'), params.get('end'))
+            except ValueError as e:
+                return self._error(400, str(e))
+            self._send(200, body)
+
+        def log_message(self, format, *args):
+            logger.debug(f"{self.address_string()} - {format % args}")
+
+    return AQIRequestHandler
+
+
+def serve(store: AQIStore, host: str, port: int):
+    server = ThreadingHTTPServer((host, port), make_handler(store))
+    logger.info(f"✓ Serving AQI queries on http://{host}:{port}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Stopping server")
+    finally:
+        server.server_close()
+
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(
+        description="Query daily AQI, IAQI, max-8h and monthly metrics from the processed panel",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python scripts/aqi_service.py query aqi --station CITY --start 2024-01-01 --end 2024-01-31
+  python scripts/aqi_service.py query iaqi --station SE --start 2025-03-01
+  python scripts/aqi_service.py query monthly --station SE --pollutant PM2.5
+  python scripts/aqi_service.py serve --port 8000
+        """
+    )
+    parser.add_argument('--panel', type=Path, default=PANEL_FILE,
+                        help=f'Processed hourly panel (default: {PANEL_FILE})')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    query_parser = subparsers.add_parser('query', help='Run a single query and print JSON')
+    query_parser.add_argument('kind', choices=QUERY_KINDS)
+    query_parser.add_argument('--station', default=CITY, help=f'Station code or {CITY} (default: {CITY})')
+    query_parser.add_argument('--pollutant', help='Pollutant column (max8h and monthly)')
+    query_parser.add_argument('--start', help='First day, YYYY-MM-DD (inclusive)')
+    query_parser.add_argument('--end', help='Last day, YYYY-MM-DD (inclusive)')
+
+    serve_parser = subparsers.add_parser('serve', help='Start the HTTP server')
+    serve_parser.add_argument('--host', default='127.0.0.1', help='Bind address (default: 127.0.0.1)')
+    serve_parser.add_argument('--port', type=int, default=8000, help='Port (default: 8000)')
+
+    args = parser.parse_args()
+
+    if not args.panel.exists():
+        logger.error(f"Panel not found: {args.panel}")
+        sys.exit(1)
+
+    logger.info(f"Precomputing daily tables from {args.panel}...")
+    store = AQIStore.from_csv(args.panel)
+    logger.info(f"✓ Ready: {len(store.stations)} stations, {len(store.pollutants)} pollutants")
+
+    if args.command == 'serve':
+        serve(store, args.host, args.port)
+        return
+
+    try:
+        rows = store.query(args.kind, args.station, args.pollutant, args.start, args.end)
+    except ValueError as e:
+        logger.error(str(e))
+        sys.exit(1)
+    print(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
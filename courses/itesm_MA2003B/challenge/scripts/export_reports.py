@@ -6,7 +6,7 @@ This script exports all Jupyter notebooks in the notebooks/ directory to HTML re
 in the reports/exports/ directory. If Pandoc is installed, it can also export to PDF.
 
 Usage:
-    python scripts/export_reports.py [--format html|pdf|both] [--verbose]
+    python scripts/export_reports.py [--format html|pdf|both] [--verbose] [--run-log PATH] [--profile-dir DIR]
 
 Requirements:
     - nbconvert (pip install nbconvert)
@@ -19,7 +19,9 @@ import subprocess
 import argparse
 from pathlib import Path
 import logging
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+
+from instrumentation import RunLog
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -28,6 +30,7 @@ logger = logging.getLogger(__name__)
 # Notebook configuration
 NOTEBOOKS_DIR = Path("notebooks")
 EXPORTS_DIR = Path("reports/exports")
+LOGS_DIR = Path("logs")
 NOTEBOOK_ORDER = [
     ("database_processing.ipynb", "01_database_processing_report"),
     ("data_imputation.ipynb", "02_data_imputation_report"),
@@ -113,17 +116,19 @@ def export_notebook(notebook_path: Path, output_name: str, format: str, verbose:
         logger.error(f"Error: {e.stderr}")
         return False
 
-def export_all_notebooks(formats: List[str], verbose: bool = False) -> Tuple[int, int]:
+def export_all_notebooks(formats: List[str], verbose: bool = False, run_log: Optional[RunLog] = None) -> Tuple[int, int]:
     """
     Export all notebooks in the configured order.
     
     Args:
         formats: List of formats to export ('html', 'pdf')
         verbose: Enable verbose logging
+        run_log: Records one stage per export (in memory only if None)
         
     Returns:
         Tuple of (successful_exports, total_attempts)
     """
+    run_log = run_log or RunLog()
     successful = 0
     total = 0
     
@@ -136,8 +141,13 @@ def export_all_notebooks(formats: List[str], verbose: bool = False) -> Tuple[int
         
         for format in formats:
             total += 1
-            if export_notebook(notebook_path, output_name, format, verbose):
-                successful += 1
+            with run_log.stage(f"export.{output_name}.{format}") as stage:
+                stage.read(notebook_path)
+                if export_notebook(notebook_path, output_name, format, verbose):
+                    successful += 1
+                    stage.wrote(EXPORTS_DIR / f"{output_name}.{format}")
+                else:
+                    stage.failed()
     
     return successful, total
 
@@ -212,6 +222,7 @@ Examples:
   python scripts/export_reports.py --format pdf       # Export to PDF only
   python scripts/export_reports.py --format both      # Export to both HTML and PDF
   python scripts/export_reports.py --verbose          # Enable verbose logging
+  python scripts/export_reports.py --profile-dir logs/profiles  # cProfile dump per export
         """
     )
     
@@ -228,6 +239,19 @@ Examples:
         help='Enable verbose logging'
     )
     
+    parser.add_argument(
+        '--run-log',
+        type=Path,
+        default=LOGS_DIR / "export_reports.jsonl",
+        help='JSON-lines file the per-export timings are appended to (default: logs/export_reports.jsonl)'
+    )
+    
+    parser.add_argument(
+        '--profile-dir',
+        type=Path,
+        help='Write one cProfile dump per export to this directory'
+    )
+    
     args = parser.parse_args()
     
     if args.verbose:
@@ -262,7 +286,8 @@ Examples:
     
     # Export notebooks
     logger.info(f"Exporting notebooks to: {', '.join(formats).upper()}")
-    successful, total = export_all_notebooks(formats, args.verbose)
+    run_log = RunLog(args.run_log, args.profile_dir)
+    successful, total = export_all_notebooks(formats, args.verbose, run_log)
     
     # Create index for HTML exports
     if 'html' in formats:
@@ -271,6 +296,7 @@ Examples:
     # Summary
     logger.info("=== Export Summary ===")
     logger.info(f"Successful exports: {successful}/{total}")
+    run_log.log_summary()
     
     if successful == total:
         logger.info("✓ All exports completed successfully!")
@@ -0,0 +1,150 @@
+"""
+In-memory cache for processed datasets
+
+The analysis notebooks call their plotting functions once per contaminant, and each
+call used to re-read the same processed CSV. This module keeps the parsed frames
+(and any series derived from them) in memory so a loop over all contaminants only
+pays the I/O cost once.
+
+Entries are keyed on the resolved path, the file modification time and the column
+selection, so rewriting a CSV invalidates its entries automatically. Both stores are
+LRU-evicted once they reach their size cap.
+
+Usage (from a notebook in notebooks/):
+    import sys, os
+    sys.path.append(os.path.join("..", "scripts"))
+    from frame_cache import CACHE
+
+    df = CACHE.load_csv("../data/processed/pre_imputation_subset_AB_v1.csv")
+    daily = CACHE.derived(path, ("daily_mean", "PM2.5"), lambda: ...)
+
+Frames returned by the cache are shared between callers and must be treated as
+read-only; copy them before mutating.
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Hashable, Optional, Sequence, Tuple
+
+import pandas as pd
+
+DEFAULT_MAX_FRAMES = 4
+DEFAULT_MAX_DERIVED = 128
+
+
+class FrameCache:
+    """LRU cache of loaded CSV frames and values derived from them."""
+
+    def __init__(self, max_frames: int = DEFAULT_MAX_FRAMES, max_derived: int = DEFAULT_MAX_DERIVED):
+        if max_frames < 1 or max_derived < 1:
+            raise ValueError("Cache sizes must be at least 1")
+        self.max_frames = max_frames
+        self.max_derived = max_derived
+        self._frames: "OrderedDict[Tuple, pd.DataFrame]" = OrderedDict()
+        self._derived: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.reads = 0
+
+    @staticmethod
+    def _source_key(path) -> Tuple[str, int]:
+        """Identify a file by its resolved path and modification time."""
+        resolved = Path(path).resolve()
+        return str(resolved), resolved.stat().st_mtime_ns
+
+    @staticmethod
+    def _store(store: OrderedDict, key: Tuple, value: Any, max_size: int):
+        store[key] = value
+        store.move_to_end(key)
+        while len(store) > max_size:
+            store.popitem(last=False)
+
+    def load_csv(
+        self,
+        path,
+        columns: Optional[Sequence[str]] = None,
+        parse_dates: Sequence[str] = ("date",),
+    ) -> pd.DataFrame:
+        """
+        Load a CSV through the cache.
+
+        Args:
+            path: Path to the CSV file
+            columns: Optional subset of columns to load (all columns if None)
+            parse_dates: Columns parsed as datetimes
+
+        Returns:
+            The parsed DataFrame (shared, do not mutate in place)
+        """
+        source = self._source_key(path)
+        cols = tuple(columns) if columns is not None else None
+        dates = tuple(parse_dates)
+        key = source + (cols, dates)
+
+        if key in self._frames:
+            self.hits += 1
+            self._frames.move_to_end(key)
+            return self._frames[key]
+
+        # A column subset can be served from an already cached full frame
+        full_key = source + (None, dates)
+        if cols is not None and full_key in self._frames:
+            self.hits += 1
+            self._frames.move_to_end(full_key)
+            frame = self._frames[full_key].loc[:, list(cols)]
+        else:
+            self.misses += 1
+            self.reads += 1
+            frame = pd.read_csv(
+                path,
+                usecols=list(cols) if cols is not None else None,
+                parse_dates=[c for c in dates if cols is None or c in cols],
+                engine="pyarrow",
+            )
+
+        self._store(self._frames, key, frame, self.max_frames)
+        return frame
+
+    def derived(self, path, name: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return a value derived from a file, computing it only on the first call.
+
+        Args:
+            path: File the value is derived from (its mtime invalidates the entry)
+            name: Hashable identifier of the derived value, e.g. ("daily_mean", "CO")
+            compute: Zero-argument callable that builds the value on a miss
+
+        Returns:
+            The cached or freshly computed value
+        """
+        key = self._source_key(path) + (name,)
+
+        if key in self._derived:
+            self.hits += 1
+            self._derived.move_to_end(key)
+            return self._derived[key]
+
+        self.misses += 1
+        value = compute()
+        self._store(self._derived, key, value, self.max_derived)
+        return value
+
+    def clear(self):
+        """Drop every cached entry and reset the counters."""
+        self._frames.clear()
+        self._derived.clear()
+        self.hits = self.misses = self.reads = 0
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current entry counts."""
+        return {
+            'frames': len(self._frames),
+            'derived': len(self._derived),
+            'hits': self.hits,
+            'misses': self.misses,
+            'reads': self.reads,
+        }
+
+
+# Shared instance used by the notebooks
+CACHE = FrameCache()
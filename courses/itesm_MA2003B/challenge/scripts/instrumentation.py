@@ -0,0 +1,285 @@
+"""
+Stage-level instrumentation for the pipeline scripts
+
+Wrap each step of a script in a stage to record how long it took and what it touched:
+
+    wall time, CPU time (own process and finished child processes), RSS before/after
+    the stage and its peak RSS, tracemalloc peak (optional), rows/columns produced,
+    bytes read and written.
+
+On Linux the RSS high-water mark is reset at the start of each stage (/proc/self/clear_refs),
+so peak_rss_mb is the peak of that stage. Elsewhere only the process-lifetime peak is
+available; peak_rss_scope says which one was recorded.
+
+Every finished stage is appended as one JSON object per line to the run log, and an
+optional cProfile dump can be written per stage. `RunLog.log_summary()` prints a table
+with one row per stage, in the same logging style as the export summary.
+
+Usage:
+    run_log = RunLog("../logs/process_datasets.jsonl", profile_dir=None)
+
+    with run_log.stage("read.2024") as stage:
+        frame = pd.read_excel(path, sheet_name=None)
+        stage.read(path)
+        stage.frame(frame)
+
+    run_log.log_summary()
+"""
+
+import cProfile
+import json
+import logging
+import os
+import re
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+PROC_STATUS = Path("/proc/self/status")
+PROC_CLEAR_REFS = Path("/proc/self/clear_refs")
+
+
+def _max_rss_mb(who) -> Optional[float]:
+    """Process-lifetime high-water RSS of this process (or of its largest waited-for child) in MB."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return rss / MB if sys.platform == 'darwin' else rss / 1024
+
+
+def _proc_status_mb(field: str) -> Optional[float]:
+    """A kB field of /proc/self/status (e.g. VmRSS, VmHWM) in MB, None where unavailable."""
+    try:
+        with open(PROC_STATUS, encoding='ascii') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the RSS high-water mark (VmHWM) of this process; False where unsupported."""
+    try:
+        with open(PROC_CLEAR_REFS, 'w', encoding='ascii') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+class Stage:
+    """Measurements of a single stage, filled in by the code running inside it."""
+
+    def __init__(self, name: str, run_id: str, **meta):
+        self.name = name
+        self.record = {
+            'run_id': run_id,
+            'stage': name,
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'status': 'ok',
+            'rows': None,
+            'cols': None,
+            'bytes_read': 0,
+            'bytes_written': 0,
+            **meta,
+        }
+
+    def frame(self, frame):
+        """Record the shape of a DataFrame, or of a dict of sheets (rows summed)."""
+        if isinstance(frame, dict):
+            shapes = [f.shape for f in frame.values()]
+            self.record['rows'] = sum(r for r, _ in shapes)
+            self.record['cols'] = max((c for _, c in shapes), default=0)
+        elif frame is not None and hasattr(frame, 'shape'):
+            self.record['rows'], self.record['cols'] = frame.shape[0], (frame.shape[1] if frame.ndim > 1 else 1)
+        return frame
+
+    def read(self, path):
+        """Add the size of a file read by this stage."""
+        self.record['bytes_read'] += _file_size(path)
+
+    def wrote(self, path):
+        """Add the size of a file written by this stage."""
+        self.record['bytes_written'] += _file_size(path)
+
+    def note(self, **fields):
+        """Store extra fields with the record (e.g. validation stats)."""
+        self.record.update(fields)
+
+    def failed(self, error: str = ""):
+        """Mark the stage as failed without raising (e.g. a subprocess returned an error)."""
+        self.record['status'] = 'error'
+        if error:
+            self.record['error'] = error
+
+
+def _file_size(path) -> int:
+    try:
+        return Path(path).stat().st_size
+    except OSError:
+        return 0
+
+
+class RunLog:
+    """Collects stage records for one run and appends them to a JSON-lines file."""
+
+    def __init__(self, path=None, profile_dir=None, trace_memory: bool = False):
+        """
+        Args:
+            path: JSON-lines file the records are appended to (None to keep them in memory only)
+            profile_dir: Directory for one cProfile dump per stage (None to disable profiling)
+            trace_memory: Track the Python allocation peak of each stage with tracemalloc (slower)
+        """
+        self.path = Path(path) if path else None
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self.trace_memory = trace_memory
+        self.run_id = f"{datetime.now():%Y%m%dT%H%M%S}-{os.getpid()}"
+        self.records: List[dict] = []
+        # Peaks (RSS MB, tracemalloc bytes) of the open stages, so nested stages don't hide the outer peak
+        self._open_peaks: List[dict] = []
+
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.profile_dir:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+
+    @contextmanager
+    def stage(self, name: str, **meta):
+        """
+        Measure the enclosed block as stage `name`.
+
+        Args:
+            name: Stage name, e.g. "read.2024" or "export.01_database_processing_report.html"
+            **meta: Extra fields stored with the record
+
+        Yields:
+            The Stage, to record frame shapes and file sizes
+        """
+        stage = Stage(name, self.run_id, **meta)
+
+        # The enclosing stage keeps the peaks reached so far before this stage resets them
+        if self._open_peaks:
+            outer = self._open_peaks[-1]
+            outer['rss'] = max(outer['rss'], _proc_status_mb('VmHWM') or 0.0)
+            if tracemalloc.is_tracing():
+                outer['py'] = max(outer['py'], tracemalloc.get_traced_memory()[1])
+        self._open_peaks.append({'rss': 0.0, 'py': 0})
+
+        tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        elif self.trace_memory:
+            tracemalloc.reset_peak()
+
+        per_stage_peak = _reset_peak_rss()
+        rss_before = _proc_status_mb('VmRSS')
+
+        profiler = cProfile.Profile() if self.profile_dir else None
+        times_start = os.times()
+        wall_start = time.perf_counter()
+        if profiler:
+            profiler.enable()
+
+        try:
+            yield stage
+        except BaseException as e:
+            stage.record['status'] = 'error'
+            stage.record['error'] = repr(e)
+            raise
+        finally:
+            if profiler:
+                profiler.disable()
+            wall = time.perf_counter() - wall_start
+            times_end = os.times()
+
+            record = stage.record
+            record['wall_s'] = round(wall, 6)
+            record['cpu_s'] = round((times_end.user - times_start.user) + (times_end.system - times_start.system), 6)
+            record['child_cpu_s'] = round(
+                (times_end.children_user - times_start.children_user)
+                + (times_end.children_system - times_start.children_system), 6)
+            rss_after = _proc_status_mb('VmRSS')
+            record['rss_before_mb'] = rss_before
+            record['rss_after_mb'] = rss_after
+            record['rss_delta_mb'] = (
+                round(rss_after - rss_before, 3) if rss_before is not None and rss_after is not None else None
+            )
+
+            inner_peaks = self._open_peaks.pop()
+            if per_stage_peak:
+                record['peak_rss_mb'] = max(_proc_status_mb('VmHWM') or 0.0, inner_peaks['rss'])
+                record['peak_rss_scope'] = 'stage'
+            else:
+                record['peak_rss_mb'] = _max_rss_mb(resource.RUSAGE_SELF) if resource else None
+                record['peak_rss_scope'] = 'process'
+            record['child_peak_rss_mb'] = _max_rss_mb(resource.RUSAGE_CHILDREN) if resource else None
+
+            py_peak = None
+            if self.trace_memory:
+                py_peak = max(tracemalloc.get_traced_memory()[1], inner_peaks['py'])
+                record['tracemalloc_peak_mb'] = round(py_peak / MB, 3)
+                if tracing:
+                    tracemalloc.stop()
+
+            if self._open_peaks:
+                outer = self._open_peaks[-1]
+                outer['rss'] = max(outer['rss'], record['peak_rss_mb'] or 0.0)
+                outer['py'] = max(outer['py'], py_peak or 0)
+
+            if profiler:
+                profile_path = self.profile_dir / f"{self.run_id}_{re.sub(r'[^A-Za-z0-9_.-]', '_', name)}.prof"
+                profiler.dump_stats(profile_path)
+                record['profile'] = str(profile_path)
+
+            self._append(record)
+
+    def _append(self, record: dict):
+        self.records.append(record)
+        if self.path:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, default=str) + '\n')
+
+    def log_summary(self):
+        """Log one row per stage plus the totals."""
+        if not self.records:
+            return
+
+        def fmt(value, spec=''):
+            return '-' if value is None else format(value, spec)
+
+        logger.info("=== Stage Summary ===")
+        logger.info(f"  {'stage':<44} {'wall':>9} {'cpu':>9} {'peak MB':>8} {'Δrss MB':>8} {'py MB':>8} "
+                    f"{'rows':>9} {'cols':>5} {'read MB':>8} {'written MB':>10}")
+        for r in self.records:
+            logger.info(
+                f"  {r['stage']:<44} {r['wall_s']:>8.3f}s {r['cpu_s'] + r['child_cpu_s']:>8.3f}s "
+                f"{fmt(r.get('peak_rss_mb'), '.0f'):>8} {fmt(r.get('rss_delta_mb'), '+.1f'):>8} "
+                f"{fmt(r.get('tracemalloc_peak_mb'), '.1f'):>8} "
+                f"{fmt(r['rows']):>9} {fmt(r['cols']):>5} "
+                f"{r['bytes_read'] / MB:>8.2f} {r['bytes_written'] / MB:>10.2f}"
+                + ("  ✗" if r['status'] != 'ok' else "")
+            )
+
+        total_wall = sum(r['wall_s'] for r in self.records)
+        logger.info(f"  Total: {total_wall:.3f}s over {len(self.records)} stages")
+        if any(r.get('peak_rss_scope') == 'process' for r in self.records):
+            logger.info("  peak MB is the process-lifetime peak (no per-stage reset on this platform)")
+        if self.path:
+            logger.info(f"Run log: {self.path} (run_id {self.run_id})")
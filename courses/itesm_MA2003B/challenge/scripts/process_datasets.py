@@ -1,7 +1,15 @@
+import argparse
+import logging
+import re
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
+from instrumentation import RunLog
+
+logger = logging.getLogger(__name__)
+
 labels = {
 	'stations': {
 		'SE': 'sureste',
@@ -44,230 +52,434 @@ additional_labels = {
 	}
 }
 
-df_2020_2021_all_stations = pd.read_excel(
-	Path("../data/raw/DATOS HISTÓRICOS 2020_2021_TODAS ESTACIONES.xlsx"),
-	sheet_name=None
-)
-
-df_2022_2023_all_stations = pd.read_excel(
-	Path("../data/raw/DATOS HISTÓRICOS 2022_2023_TODAS ESTACIONES.xlsx"),
-	sheet_name=None
-)
-
-df_2024_all_stations = pd.read_excel(
-	Path("../data/raw/BD 2024.xlsx"),
-	sheet_name=None
-)
-
-df_2025_all_stations = pd.read_excel(
-	Path("../data/raw/BD 2025.xlsx"),
-	sheet_name=None
-)
-
-df_2023_2024_all_stations = pd.read_excel(
-	Path("../data/raw/DATOS HISTÓRICOS 2023_2024_TODAS ESTACIONES_ITESM.xlsx"),
-	sheet_name='Param_horarios_Estaciones',
-	header=None
-)
-
-# Process dataset 1
-frames = []
-for name, frame in df_2020_2021_all_stations.items():
-	if name == 'NOROESTE3':
-		continue
-	for code, codename in labels['stations'].items():
-		frame_copy = frame.copy()
-		if isinstance(codename, list):
-			if any(name.upper() == cn.upper() for cn in codename):
-				frame_copy['station_code'] = code
-				frames.append(frame_copy)
-		else:
-			if name.upper() == codename.upper():
-				frame_copy['station_code'] = code
-				frames.append(frame_copy)
-
-df_2020_2021_all_stations_processed = pd.concat(frames, ignore_index=True)
-
-# Process dataset 2
-frames = []
-for name, frame in df_2022_2023_all_stations.items():
-	for code, codename in labels['stations'].items():
-		frame_copy = frame.copy()
-		if isinstance(codename, list):
-			if any(name.upper() == cn.upper() for cn in codename):
-				frame_copy['station_code'] = code
-				frames.append(frame_copy)
-		else:
-			if name.upper() == codename.upper():
-				frame_copy['station_code'] = code
-				frames.append(frame_copy)
+RAW_DIR = Path("../data/raw")
+PROCESSED_DIR = Path("../data/processed")
+LOGS_DIR = Path("../logs")
 
-df_2022_2023_all_stations_processed = pd.concat(frames, ignore_index=True)
+RAW_FILES = {
+	'2020_2021': "DATOS HISTÓRICOS 2020_2021_TODAS ESTACIONES.xlsx",
+	'2022_2023': "DATOS HISTÓRICOS 2022_2023_TODAS ESTACIONES.xlsx",
+	'2023_2024': "DATOS HISTÓRICOS 2023_2024_TODAS ESTACIONES_ITESM.xlsx",
+	'2024': "BD 2024.xlsx",
+	'2025': "BD 2025.xlsx"
+}
 
-# Process dataset 3
-stations_map = labels['stations']
+OUTPUT_FILES = {
+	'2020_2021': "df_2020_2021_all_stations_processed.csv",
+	'2022_2023': "df_2022_2023_all_stations_processed.csv",
+	'2023_2024': "df_2023_2024_all_stations_processed_no_2024.csv",
+	'2024': "df_2024_all_stations_processed.csv",
+	'2025': "df_2025_all_stations_processed.csv",
+	'main': "main_dataframe.csv"
+}
 
-station_name_to_code = {}
-for code, names in stations_map.items():
-	if isinstance(names, list):
-		for name in names:
-			station_name_to_code[name.upper()] = code
-	else:
-		station_name_to_code[names.upper()] = code
 
-stations_row = df_2023_2024_all_stations.iloc[0, 1:].astype(str).str.strip()
-vars_row = df_2023_2024_all_stations.iloc[1, 1:].astype(str).str.strip()
+SENTINELS = (-9999,)
+
+PARAMETER_CODES = list(labels['contaminants'].keys()) + list(additional_labels['parameters'].keys())
+
+# Expected unit of each parameter; a different unit in a header or units row is reported
+PARAMETER_UNITS = {
+	'PM10': 'ug/m3',
+	'PM2.5': 'ug/m3',
+	'O3': 'ppb',
+	'SO2': 'ppb',
+	'NO2': 'ppb',
+	'CO': 'ppm',
+	'NO': 'ppb',
+	'NOX': 'ppb',
+	'TOUT': 'degC',
+	'RH': '%',
+	'SR': 'kW/m2',
+	'RAINF': 'mm/Hr',
+	'PRS': 'mmHg',
+	'WSR': 'km/hr',
+	'WDR': 'deg'
+}
 
-full_body = df_2023_2024_all_stations.iloc[3:].reset_index(drop=True)
-dates = pd.to_datetime(full_body.iloc[:, 0], errors="coerce", dayfirst=True)
-body = full_body.iloc[:, 1:]
+STATION_CODES_BY_NAME = {
+	name.upper(): code
+	for code, names in labels['stations'].items()
+	for name in (names if isinstance(names, list) else [names])
+}
 
-contaminants = list(labels["contaminants"].keys())
+# Column layout of each raw source, compiled once into a SheetSchema:
+#   date            regex matching the start of the date column name
+#   dayfirst        date strings are day-first (dd/mm/YYYY)
+#   strict          columns are named exactly after the parameter codes; otherwise the code
+#                   may be followed by a unit or description, e.g. "NO2 (ppb)"
+#   aliases         alternative names of a parameter code
+#   units_row       a units row may sit right below the header (detected and dropped)
+#   columns         'all' keeps every column, 'known' only the date and the parameters,
+#                   'canonical' the same in the order of PARAMETER_CODES
+# Every parameter is cast to float64 and the sentinels become NaN; the date becomes datetime64.
+SOURCE_SCHEMAS = {
+	'2020_2021': {'date': r'date$', 'strict': True, 'columns': 'all'},
+	'2022_2023': {'date': r'date$', 'strict': True, 'columns': 'all'},
+	'2023_2024': {'date': r'date$', 'dayfirst': True, 'strict': True, 'aliases': {'WDV': 'WDR'}, 'columns': 'known'},
+	'2024': {'date': r'fecha', 'dayfirst': True, 'strict': False, 'columns': 'canonical'},
+	'2025': {'date': r'date$', 'strict': True, 'units_row': True, 'columns': 'all'}
+}
 
-frames = []
-for station in stations_row.unique():
-	if pd.isna(station) or station == "nan" or station.upper() not in station_name_to_code:
-		continue
 
-	station_columns = stations_row[stations_row == station].index.tolist()
+def _normalize_unit(unit):
+	return str(unit).strip().lower().replace(' ', '').replace('µ', 'u').replace('μ', 'u').replace('³', '3')
 
-	station_data = {
-		"station_code": station_name_to_code[station.upper()],
-		"date": dates
-	}
 
-	for col_idx in station_columns:
-		if col_idx not in vars_row.index or col_idx not in body.columns:
-			print(f"Warning: Column label {col_idx} not found in vars_row or body.")
+class SheetSchema:
+	"""Column resolution, casts and validation for the sheets of one raw source."""
+
+	def __init__(self, source, date, dayfirst=False, strict=True, aliases=None, units_row=False,
+				 columns='all', sentinels=SENTINELS):
+		self.source = source
+		self.dayfirst = dayfirst
+		self.units_row = units_row
+		self.columns = columns
+		self.sentinels = np.array(sentinels, dtype='float64')
+		self.aliases = {name.upper(): code for name, code in (aliases or {}).items()}
+
+		# Longest code first, and no letter or digit right after it, so "NOX (ppb)" is NOX and not NO
+		codes = sorted(PARAMETER_CODES + list(self.aliases), key=len, reverse=True)
+		alternatives = '|'.join(re.escape(code) for code in codes)
+		if strict:
+			pattern = rf'^(?P<code>{alternatives})(?P<unit>)$'
+		else:
+			pattern = rf'^(?P<code>{alternatives})(?![A-Z0-9.])\s*(?:\((?P<unit>[^)]*)\))?.*$'
+		self.column_pattern = re.compile(pattern, re.IGNORECASE)
+		self.date_pattern = re.compile(date, re.IGNORECASE)
+
+	def resolve(self, columns):
+		"""
+		Map the raw column names to 'date' and the parameter codes.
+
+		Returns:
+			(positions, names, units, unmatched, duplicates): positions and new names of the
+			kept columns, units found in the headers, and the raw names left out
+		"""
+		raw = pd.Index(columns).astype(str).str.strip()
+		found = raw.str.extract(self.column_pattern)
+		target = found['code'].str.upper().replace(self.aliases)
+		target[raw.str.match(self.date_pattern)] = 'date'
+
+		duplicates = target.notna() & target.duplicated()
+		unmatched = target.isna()
+		keep = ~duplicates & (~unmatched | (self.columns == 'all'))
+		names = target.where(~unmatched, pd.Series(columns, dtype=object))
+
+		positions = np.flatnonzero(keep)
+		if self.columns == 'canonical':
+			order = {name: i for i, name in enumerate(['date'] + PARAMETER_CODES)}
+			positions = sorted(positions, key=lambda i: order[names[i]])
+
+		has_unit = (found['unit'].fillna('').str.len() > 0) & ~duplicates
+		units = {target[i]: found['unit'][i] for i in np.flatnonzero(has_unit)}
+		return (
+			list(positions),
+			names.iloc[positions].tolist(),
+			units,
+			list(raw[unmatched]),
+			list(raw[duplicates])
+		)
+
+	def _header_rows(self, frame, params):
+		"""Count of leading rows that hold units instead of data (no date, no numeric value), and those units."""
+		head = frame.iloc[:3]
+		if head.empty:
+			return 0, {}
+		numeric = pd.to_numeric(pd.Series(head[params].to_numpy().ravel()), errors='coerce').notna()
+		numeric = numeric.to_numpy().reshape(len(head), len(params)).any(axis=1)
+		no_date = pd.to_datetime(head['date'], errors='coerce').isna().to_numpy() if 'date' in head else True
+		is_header = ~numeric & no_date
+		count = int(np.cumprod(is_header).sum())
+		units = head.iloc[0][params].dropna().astype(str).to_dict() if count else {}
+		return count, units
+
+	def apply(self, frame, sheet, stats=None, units=None):
+		"""
+		Resolve the columns of one sheet, drop the units row and cast every parameter at once.
+
+		Args:
+			frame: Raw sheet
+			sheet: Sheet name (for the validation stats)
+			stats: List the validation stats of this sheet are appended to (optional)
+			units: Units of the parameters when they are stored outside the sheet (dataset 3)
+
+		Returns:
+			DataFrame with 'date' as datetime64 and the parameters as float64
+		"""
+		positions, names, header_units, unmatched, duplicates = self.resolve(frame.columns)
+		frame = frame.take(positions, axis=1)
+		frame.columns = names
+		params = [c for c in names if c in PARAMETER_UNITS]
+
+		header_rows = 0
+		if self.units_row and params:
+			header_rows, row_units = self._header_rows(frame, params)
+			header_units.update(row_units)
+			if header_rows:
+				frame = frame.iloc[header_rows:].reset_index(drop=True)
+
+		unparsed_dates = 0
+		if 'date' in frame.columns and not pd.api.types.is_datetime64_any_dtype(frame['date']):
+			missing = frame['date'].isna().sum()
+			frame['date'] = pd.to_datetime(frame['date'], errors='coerce', dayfirst=self.dayfirst)
+			unparsed_dates = int(frame['date'].isna().sum() - missing)
+
+		coerced = np.zeros(len(params), dtype=int)
+		sentinels = np.zeros(len(params), dtype=int)
+		if params:
+			block = frame[params].to_numpy()
+			if block.dtype.kind in 'biuf':
+				values = block.astype('float64')
+			else:
+				flat = pd.to_numeric(pd.Series(block.ravel()), errors='coerce')
+				values = flat.to_numpy(dtype='float64', na_value=np.nan).reshape(block.shape)
+				coerced = (np.isnan(values) & ~pd.isna(block)).sum(axis=0)
+			is_sentinel = np.isin(values, self.sentinels)
+			sentinels = is_sentinel.sum(axis=0)
+			values[is_sentinel] = np.nan
+			frame[params] = values
+
+		expected = {code: PARAMETER_UNITS[code] for code in params}
+		# Blank unit cells are not a mismatch (and NaN isn't valid JSON in the run log)
+		found_units = {
+			code: unit for code, unit in {**(units or {}), **header_units}.items()
+			if not pd.isna(unit) and str(unit).strip()
+		}
+		unit_mismatch = {
+			code: unit for code, unit in found_units.items()
+			if code in expected and _normalize_unit(unit) != _normalize_unit(expected[code])
+		}
+
+		record = {
+			'source': self.source,
+			'sheet': str(sheet),
+			'rows': len(frame),
+			'parameters': params,
+			'header_rows': header_rows,
+			'unmatched_columns': unmatched,
+			'duplicate_columns': duplicates,
+			'unparsed_dates': unparsed_dates,
+			'sentinels': {code: int(n) for code, n in zip(params, sentinels) if n},
+			'coerced': {code: int(n) for code, n in zip(params, coerced) if n},
+			'unit_mismatch': unit_mismatch,
+			'missing_values': int(frame[params].isna().to_numpy().sum()) if params else 0
+		}
+		issues = [
+			f"{field.replace('_', ' ')}: {record[field]}"
+			for field in ('duplicate_columns', 'unparsed_dates', 'coerced', 'unit_mismatch')
+			if record[field]
+		]
+		if issues:
+			logger.warning(f"{self.source}/{sheet}: " + '; '.join(issues))
+		if stats is not None:
+			stats.append(record)
+
+		return frame
+
+
+SCHEMAS = {source: SheetSchema(source, **spec) for source, spec in SOURCE_SCHEMAS.items()}
+
+
+def read_dataset(key, raw_dir=RAW_DIR):
+	"""Read one raw workbook (all sheets, except dataset 3 which is a single headerless sheet)."""
+	if key == '2023_2024':
+		return pd.read_excel(
+			Path(raw_dir) / RAW_FILES[key],
+			sheet_name='Param_horarios_Estaciones',
+			header=None
+		)
+
+	return pd.read_excel(
+		Path(raw_dir) / RAW_FILES[key],
+		sheet_name=None
+	)
+
+
+def _tag_station_sheets(sheets, schema, stats=None, skip=()):
+	frames = []
+	for name, frame in sheets.items():
+		if name in skip or name.upper() not in STATION_CODES_BY_NAME:
 			continue
+		frame = schema.apply(frame, name, stats)
+		frame['station_code'] = STATION_CODES_BY_NAME[name.upper()]
+		frames.append(frame)
 
-		var_name = vars_row.loc[col_idx]
-		# Normalize known aliases in dataset 3 (only)
-		if var_name == "WDV":
-			var_name = "WDR"
+	return pd.concat(frames, ignore_index=True)
 
-		if var_name in contaminants or var_name in additional_labels["parameters"]:
-			column_data = body.loc[:, col_idx]
-			station_data[var_name] = pd.to_numeric(column_data, errors='coerce')
 
-	if len(station_data) > 3:
-		station_df = pd.DataFrame(station_data)
-		frames.append(station_df)
+def process_dataset_1(sheets, stats=None):
+	"""Dataset 1 (2020-2021): one sheet per station, named after the station."""
+	return _tag_station_sheets(sheets, SCHEMAS['2020_2021'], stats, skip=('NOROESTE3',))
 
-df_2023_2024_all_stations_processed = pd.concat(frames, ignore_index=True)
 
-if 'date' in df_2023_2024_all_stations_processed.columns:
-	mask_not_2024 = df_2023_2024_all_stations_processed['date'].isna() | (df_2023_2024_all_stations_processed['date'].dt.year != 2024)
-	df_2023_2024_all_stations_processed_no_2024 = df_2023_2024_all_stations_processed.loc[mask_not_2024].reset_index(drop=True)
-else:
-	df_2023_2024_all_stations_processed_no_2024 = df_2023_2024_all_stations_processed
+def process_dataset_2(sheets, stats=None):
+	"""Dataset 2 (2022-2023): same layout as dataset 1."""
+	return _tag_station_sheets(sheets, SCHEMAS['2022_2023'], stats)
 
-# Process dataset 4
-frames_2024 = []
 
-param_codes_2024 = list(labels["contaminants"].keys()) + list(additional_labels["parameters"].keys())
+def process_dataset_3(raw, stats=None):
+	"""Dataset 3 (2023-2024): single wide sheet with station, variable and unit header rows; 2024 rows are dropped."""
+	schema = SCHEMAS['2023_2024']
 
-for sheet_name, frame in df_2024_all_stations.items():
-	code_clean = str(sheet_name).strip().upper()
-	if code_clean in labels['stations'].keys():
-		f = frame.copy()
-		rename_map = {}
+	stations_row = raw.iloc[0, 1:].astype(str).str.strip()
+	vars_row = raw.iloc[1, 1:].astype(str).str.strip()
+	units_row = raw.iloc[2, 1:]
 
-		for c in f.columns:
-			c_str = str(c).strip()
-			c_upper = c_str.upper()
-			c_lower = c_str.lower()
+	full_body = raw.iloc[3:].reset_index(drop=True)
+	dates = pd.to_datetime(full_body.iloc[:, 0], errors="coerce", dayfirst=True)
+	body = full_body.iloc[:, 1:]
 
-			if c_lower.startswith('fecha'):
-				rename_map[c] = 'date'
-				continue
+	frames = []
+	for station in stations_row.unique():
+		if pd.isna(station) or station == "nan" or station.upper() not in STATION_CODES_BY_NAME:
+			continue
 
-			match = next((code for code in param_codes_2024 if c_upper.startswith(code)), None)
+		station_columns = stations_row[stations_row == station].index.tolist()
+		station_columns = [c for c in station_columns if c in body.columns]
 
-			if match:
-				rename_map[c] = match
+		station_df = body.loc[:, station_columns].set_axis(vars_row[station_columns].tolist(), axis=1)
+		station_df.insert(0, 'date', dates)
+		station_units = units_row[station_columns].dropna()
+		units = dict(zip(vars_row[station_units.index].str.upper().replace(schema.aliases), station_units))
 
-		if rename_map:
-			f = f.rename(columns=rename_map)
+		station_df = schema.apply(station_df, station, stats, units=units)
+		if len(station_df.columns) > 2:
+			station_df.insert(0, 'station_code', STATION_CODES_BY_NAME[station.upper()])
+			frames.append(station_df)
 
-		f = f.loc[:, ~f.columns.duplicated()].copy()
+	processed = pd.concat(frames, ignore_index=True)
 
-		if 'date' in f.columns:
-			f['date'] = pd.to_datetime(f['date'], errors='coerce', dayfirst=True)
+	if 'date' in processed.columns:
+		mask_not_2024 = processed['date'].isna() | (processed['date'].dt.year != 2024)
+		return processed.loc[mask_not_2024].reset_index(drop=True)
 
-		keep_cols = []
+	return processed
 
-		if 'date' in f.columns:
-			keep_cols.append('date')
 
-		keep_cols += [code for code in param_codes_2024 if code in f.columns]
+def process_dataset_4(sheets, stats=None):
+	"""Dataset 4 (2024): one sheet per station code, with 'Fecha' and verbose column names such as "NO2 (ppb)"."""
+	frames_2024 = []
+	for sheet_name, frame in sheets.items():
+		code_clean = str(sheet_name).strip().upper()
+		if code_clean in labels['stations'].keys():
+			f = SCHEMAS['2024'].apply(frame, sheet_name, stats)
+			f['station_code'] = code_clean
+			frames_2024.append(f)
 
-		if keep_cols:
-			f = f.loc[:, keep_cols]
+	return pd.concat(frames_2024, ignore_index=True) if frames_2024 else pd.DataFrame()
 
-		for code in param_codes_2024:
-			if code in f.columns:
-				f[code] = pd.to_numeric(f[code], errors='coerce')
-		f['station_code'] = code_clean
-		frames_2024.append(f)
 
-df_2024_all_stations_processed = pd.concat(frames_2024, ignore_index=True) if frames_2024 else pd.DataFrame()
+def process_dataset_5(sheets, stats=None):
+	"""Dataset 5 (2025): one sheet per station code, with a units row under the header."""
+	frames_2025 = []
+	for sheet_name, frame in sheets.items():
+		code_clean = str(sheet_name).strip().upper()
+		if code_clean in labels['stations'].keys():
+			f = SCHEMAS['2025'].apply(frame, sheet_name, stats)
 
-# Process dataset 5
-frames_2025 = []
-for sheet_name, frame in df_2025_all_stations.items():
-	code_clean = str(sheet_name).strip().upper()
-	if code_clean in labels['stations'].keys():
-		f = frame.copy()
+			if 'date' in f.columns:
+				f['station_code'] = code_clean
+				frames_2025.append(f)
 
-		if len(f) > 0:
-			f = f.drop(f.index[0]).reset_index(drop=True)
+	return pd.concat(frames_2025, ignore_index=True) if frames_2025 else pd.DataFrame()
 
-		if 'date' in f.columns:
-			f['date'] = pd.to_datetime(f['date'], errors='coerce')
 
-			f['station_code'] = code_clean
-			frames_2025.append(f)
-
-df_2025_all_stations_processed = pd.concat(frames_2025, ignore_index=True) if frames_2025 else pd.DataFrame()
-
-# Concat all dataframes
-main_dataframe = pd.concat(
-	[
-		df_2020_2021_all_stations_processed,
-		df_2022_2023_all_stations_processed,
-		df_2023_2024_all_stations_processed_no_2024,
-		df_2024_all_stations_processed,
-		df_2025_all_stations_processed
-	],
-	ignore_index=True
-)
-
-Path("../data/processed").mkdir(parents=True, exist_ok=True)
-
-df_2020_2021_all_stations_processed.to_csv(
-	Path("../data/processed/df_2020_2021_all_stations_processed.csv"),
-	index=False,
-
-)
-df_2022_2023_all_stations_processed.to_csv(
-	Path("../data/processed/df_2022_2023_all_stations_processed.csv"),
-	index=False
-)
-df_2023_2024_all_stations_processed_no_2024.to_csv(
-	Path("../data/processed/df_2023_2024_all_stations_processed_no_2024.csv"),
-	index=False
-)
-df_2024_all_stations_processed.to_csv(
-	Path("../data/processed/df_2024_all_stations_processed.csv"),
-	index=False
-)
-df_2025_all_stations_processed.to_csv(
-	Path("../data/processed/df_2025_all_stations_processed.csv"),
-	index=False
-)
-
-main_dataframe.to_csv(
-	Path("../data/processed/main_dataframe.csv"),
-	index=False
-)
+PROCESSORS = {
+	'2020_2021': process_dataset_1,
+	'2022_2023': process_dataset_2,
+	'2023_2024': process_dataset_3,
+	'2024': process_dataset_4,
+	'2025': process_dataset_5
+}
+
+
+def log_validation(key, stats):
+	"""Log one line per source with the totals of its per-sheet validation stats."""
+	sentinels = sum(sum(s['sentinels'].values()) for s in stats)
+	coerced = sum(sum(s['coerced'].values()) for s in stats)
+	header_rows = sum(s['header_rows'] for s in stats)
+	logger.info(
+		f"✓ {key}: {len(stats)} sheets, {sum(s['rows'] for s in stats):,} rows, "
+		f"{sentinels:,} sentinels and {coerced:,} non-numeric values set to NaN, "
+		f"{header_rows} units rows dropped"
+	)
+
+
+def build_main_dataframe(processed):
+	"""Concat all processed datasets, in source order."""
+	return pd.concat(
+		[processed[key] for key in PROCESSORS],
+		ignore_index=True
+	)
+
+
+def write_outputs(processed, main_dataframe, processed_dir=PROCESSED_DIR, run_log=None):
+	run_log = run_log or RunLog()
+	Path(processed_dir).mkdir(parents=True, exist_ok=True)
+
+	outputs = dict(processed, main=main_dataframe)
+	for key, frame in outputs.items():
+		path = Path(processed_dir) / OUTPUT_FILES[key]
+		with run_log.stage(f"write.{key}") as stage:
+			frame.to_csv(
+				path,
+				index=False
+			)
+			stage.frame(frame)
+			stage.wrote(path)
+
+
+def run(raw_dir=RAW_DIR, processed_dir=PROCESSED_DIR, run_log=None):
+	"""Read, process, concat and write every dataset, recording one stage per step."""
+	run_log = run_log or RunLog()
+
+	processed = {}
+	for key, process in PROCESSORS.items():
+		with run_log.stage(f"read.{key}") as stage:
+			raw = stage.frame(read_dataset(key, raw_dir))
+			stage.read(Path(raw_dir) / RAW_FILES[key])
+
+		with run_log.stage(f"process.{key}") as stage:
+			stats = []
+			processed[key] = stage.frame(process(raw, stats))
+			stage.note(validation=stats)
+		log_validation(key, stats)
+
+	with run_log.stage("concat") as stage:
+		main_dataframe = stage.frame(build_main_dataframe(processed))
+
+	write_outputs(processed, main_dataframe, processed_dir, run_log)
+	return main_dataframe
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Process the raw SIMA workbooks into data/processed")
+	parser.add_argument(
+		'--run-log',
+		type=Path,
+		default=LOGS_DIR / "process_datasets.jsonl",
+		help='JSON-lines file the stage records are appended to (default: ../logs/process_datasets.jsonl)'
+	)
+	parser.add_argument(
+		'--profile-dir',
+		type=Path,
+		help='Write one cProfile dump per stage to this directory'
+	)
+	parser.add_argument(
+		'--trace-memory',
+		action='store_true',
+		help='Record the tracemalloc peak of each stage (slower)'
+	)
+	args = parser.parse_args()
+
+	logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+	run_log = RunLog(args.run_log, args.profile_dir, args.trace_memory)
+	run(run_log=run_log)
+	logger.info(f"✓ Processed datasets written to: {PROCESSED_DIR}")
+	run_log.log_summary()
+
+
+if __name__ == "__main__":
+	main()
@@ -1,9 +1,74 @@
+import argparse
 from random import random
+
 import matplotlib.pyplot as plt
+import numpy as np
 
 iterations = 1000000
+p_dry_after_dry = 0.8
+p_dry_after_rain = 0.6
 current_state = "dry"
 
+
+# --- Reducción de varianza para el tiempo medio de retorno (1 / pi: 4/3 para dry, 4 para rain) ---
+# El tiempo medio de retorno es pasos / visitas, así que se estima como 1 / fracción de visitas.
+# Las réplicas corren en paralelo (una columna por réplica) y cada estimador usa el mismo
+# número de pasos simulados, así que el VRF compara varianzas a igual costo.
+
+
+def run_chains(u):
+    # u: (pasos, réplicas). Regresa la fracción de días secos y el promedio de
+    # P(dry | estado anterior) de cada réplica
+    dry = np.ones(u.shape[1], dtype=bool)
+    dry_days = np.zeros(u.shape[1])
+    p_dry = np.zeros(u.shape[1])
+    for u_step in u:
+        p = np.where(dry, p_dry_after_dry, p_dry_after_rain)
+        dry = u_step <= p
+        dry_days += dry
+        p_dry += p
+    return dry_days / len(u), p_dry / len(u)
+
+
+def compare(n, replications, seed):
+    rng = np.random.default_rng(seed)
+    crude, conditional = run_chains(rng.random((n, replications)))
+
+    # Pares antitéticos: dos cadenas de n/2 pasos con u y 1 - u
+    u = rng.random((n // 2, replications))
+    crude_a, conditional_a = run_chains(u)
+    crude_b, conditional_b = run_chains(1 - u)
+
+    rows = {
+        "crudo": crude,
+        "condicional": conditional,
+        "antitético": (crude_a + crude_b) / 2,
+        "condicional + antitético": (conditional_a + conditional_b) / 2,
+    }
+
+    for state, exact, to_return_time in (("dry", 4 / 3, lambda f: 1 / f), ("rain", 4, lambda f: 1 / (1 - f))):
+        ref_var = to_return_time(rows["crudo"]).var(ddof=1)
+        print(f"--- Tiempo medio de retorno a {state} (exacto {exact:.4f}), {n:,} pasos x {replications} réplicas ---")
+        print(f"{'método':<26}{'estimación':>11}{'IC 95% ±':>11}{'VRF':>9}")
+        for name, fractions in rows.items():
+            estimates = to_return_time(fractions)
+            var = estimates.var(ddof=1)
+            print(f"{name:<26}{estimates.mean():>11.4f}{1.96 * np.sqrt(var):>11.4f}{ref_var / var:>9.1f}")
+
+
+parser = argparse.ArgumentParser(description="Tiempos de retorno de la cadena de Markov del clima")
+parser.add_argument("--compare", action="store_true",
+                    help="Comparar estimadores de reducción de varianza contra Monte Carlo crudo")
+parser.add_argument("--iterations", type=int, default=10000,
+                    help="Pasos por réplica en --compare (default: %(default)s)")
+parser.add_argument("--replications", type=int, default=500, help="Réplicas por estimador (default: 500)")
+parser.add_argument("--seed", type=int, default=0, help="Semilla (default: 0)")
+args = parser.parse_args()
+
+if args.compare:
+    compare(args.iterations, args.replications, args.seed)
+    raise SystemExit
+
 states = [current_state]
 steps_to_return_dry = []
 steps_to_return_rain = []
@@ -16,12 +81,12 @@ for _ in range(1, iterations):
     current_steps_rain += 1
 
     if current_state == "dry":
-        if random_num <= 0.8:
+        if random_num <= p_dry_after_dry:
             current_state = "dry"
         else:
             current_state = "rain"
     else:
-        if random_num <= 0.6:
+        if random_num <= p_dry_after_rain:
             current_state = "dry"
         else:
             current_state = "rain"
@@ -1,21 +1,83 @@
+import argparse
 from random import random
+
 import matplotlib.pyplot as plt
+import numpy as np
 
 iterations = 70000
+p_dry_after_dry = 0.8
+p_dry_after_rain = 0.6
 current_state = "dry"
 
+
+# --- Reducción de varianza para P(dry) (estacionaria: 0.6 / (0.2 + 0.6) = 0.75) ---
+# Las réplicas corren en paralelo (una columna por réplica) y cada estimador usa el mismo
+# número de pasos simulados, así que el VRF compara varianzas a igual costo.
+
+
+def run_chains(u):
+    # u: (pasos, réplicas). Regresa la fracción de días secos y el promedio de
+    # P(dry | estado anterior) de cada réplica
+    dry = np.ones(u.shape[1], dtype=bool)
+    dry_days = np.zeros(u.shape[1])
+    p_dry = np.zeros(u.shape[1])
+    for u_step in u:
+        p = np.where(dry, p_dry_after_dry, p_dry_after_rain)
+        dry = u_step <= p
+        dry_days += dry
+        p_dry += p
+    return dry_days / len(u), p_dry / len(u)
+
+
+def compare(n, replications, seed):
+    rng = np.random.default_rng(seed)
+    crude, conditional = run_chains(rng.random((n, replications)))
+
+    # Pares antitéticos: dos cadenas de n/2 pasos con u y 1 - u
+    u = rng.random((n // 2, replications))
+    crude_a, conditional_a = run_chains(u)
+    crude_b, conditional_b = run_chains(1 - u)
+
+    rows = {
+        "crudo": crude,
+        "condicional": conditional,
+        "antitético": (crude_a + crude_b) / 2,
+        "condicional + antitético": (conditional_a + conditional_b) / 2,
+    }
+    ref_var = rows["crudo"].var(ddof=1)
+
+    print(f"P(dry), {n:,} pasos x {replications} réplicas")
+    print(f"{'método':<26}{'estimación':>11}{'IC 95% ±':>11}{'VRF':>9}")
+    for name, estimates in rows.items():
+        var = estimates.var(ddof=1)
+        print(f"{name:<26}{estimates.mean():>11.4f}{1.96 * np.sqrt(var):>11.4f}{ref_var / var:>9.1f}")
+
+
+parser = argparse.ArgumentParser(description="Cadena de Markov del clima (dry / rain)")
+parser.add_argument("--compare", action="store_true",
+                    help="Comparar estimadores de reducción de varianza contra Monte Carlo crudo")
+parser.add_argument("--iterations", type=int, default=10000,
+                    help="Pasos por réplica en --compare (default: %(default)s)")
+parser.add_argument("--replications", type=int, default=500, help="Réplicas por estimador (default: 500)")
+parser.add_argument("--seed", type=int, default=0, help="Semilla (default: 0)")
+args = parser.parse_args()
+
+if args.compare:
+    compare(args.iterations, args.replications, args.seed)
+    raise SystemExit
+
 states = [current_state]
 
 for _ in range(1, iterations):
     random_num = random()
 
     if current_state == "dry":
-        if random_num <= 0.8:
+        if random_num <= p_dry_after_dry:
             current_state = "dry"
         else:
             current_state = "rain"
     else:  # current_state == "rain"
-        if random_num <= 0.6:
+        if random_num <= p_dry_after_rain:
             current_state = "dry"
         else:
             current_state = "rain"
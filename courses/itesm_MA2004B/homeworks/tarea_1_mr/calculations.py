@@ -1,33 +1,185 @@
+import argparse
 import random
+
 import matplotlib.pyplot as plt
+import numpy as np
 
 p_transport = 0.6
+p_apprehension = 0.01
 iterations = 900000
 
-apprehensions = 0
-transports = 0
-freqs = []
 
-for i in range(1, iterations + 1):
-    if random.random() < 0.01:
-        apprehensions += 1
-        if random.random() < p_transport:
-            transports += 1
+def plot_convergence(iterations, p_transport=p_transport):
+    apprehensions = 0
+    transports = 0
+    freqs = []
+
+    for i in range(1, iterations + 1):
+        if random.random() < p_apprehension:
+            apprehensions += 1
+            if random.random() < p_transport:
+                transports += 1
+
+        if apprehensions > 0:
+            freqs.append(transports / apprehensions)
+        else:
+            freqs.append(0)
+
+    plt.plot(freqs, label="Frecuencia relativa de traslado")
+    plt.axhline(p_transport, color="red", linestyle="--", label="Valor esperado (0.6)")
+    plt.xlabel("Iteraciones")
+    plt.ylabel("Frecuencia relativa")
+    plt.legend()
+    plt.grid(True)
+    plt.show()
+
+    print(
+        "Probabilidad final aproximada:",
+        transports / apprehensions if apprehensions > 0 else 0,
+    )
+
+
+# --- Estimadores de P(traslado | aprehensión) ---
+# Cada estimador recibe un generador y el número de iteraciones (patrullajes),
+# y regresa (estimación, números aleatorios usados).
+
+
+def crude(rng, n, p_transport=p_transport):
+    # Monte Carlo crudo: solo el 1% de las iteraciones produce una aprehensión
+    u_apprehension = rng.random(n)
+    apprehended = u_apprehension < p_apprehension
+    a = int(apprehended.sum())
+    t = int((rng.random(a) < p_transport).sum())
+    return (t / a if a else np.nan), n + a
+
+
+def conditional(rng, n, p_transport=p_transport, u=None):
+    # Muestreo condicional: se simula directamente el evento raro (aprehensión),
+    # cada número aleatorio decide un traslado
+    n_draws = int(n * p_apprehension) or 1
+    u_transport = rng.random(n_draws) if u is None else u[:n_draws]
+    return float((u_transport < p_transport).mean()), n_draws
+
+
+def conditional_antithetic(rng, n, p_transport=p_transport):
+    # Muestreo condicional con pares antitéticos en el traslado
+    n_draws = max(int(n * p_apprehension) // 2, 1)
+    u_transport = rng.random(n_draws)
+    t = (u_transport < p_transport).sum() + ((1 - u_transport) < p_transport).sum()
+    return float(t / (2 * n_draws)), n_draws
+
+
+# --- Estimadores de P(aprehensión y traslado) por patrullaje = 0.01 * 0.6 ---
+
+
+def crude_joint(rng, n, p_transport=p_transport):
+    # Monte Carlo crudo: fracción de patrullajes que terminan en traslado
+    a = int((rng.random(n) < p_apprehension).sum())
+    t = int((rng.random(a) < p_transport).sum())
+    return t / n, n + a
+
+
+def importance_joint(rng, n, p_transport=p_transport, q=0.5):
+    # Muestreo por importancia: la aprehensión se propone con probabilidad q y cada traslado
+    # se pondera por la razón de verosimilitudes p_apprehension / q (estimador no normalizado;
+    # los patrullajes sin aprehensión no aportan al indicador)
+    a = int((rng.random(n) < q).sum())
+    t = int((rng.random(a) < p_transport).sum())
+    return (p_apprehension / q) * t / n, n + a
+
+
+# --- Comparación de escenarios: diferencia entre dos probabilidades de traslado ---
+
+
+def crude_difference(rng, n, p_base, p_alt):
+    # Escenarios con números aleatorios independientes
+    base, draws_base = crude(rng, n, p_base)
+    alt, draws_alt = crude(rng, n, p_alt)
+    return alt - base, draws_base + draws_alt
+
+
+def crn_difference(rng, n, p_base, p_alt):
+    # Números aleatorios comunes: ambos escenarios usan las mismas aprehensiones y traslados
+    seed = rng.integers(2**32)
+    base, draws = crude(np.random.default_rng(seed), n, p_base)
+    alt, _ = crude(np.random.default_rng(seed), n, p_alt)
+    return alt - base, draws
+
+
+def crn_conditional_difference(rng, n, p_base, p_alt):
+    # Números aleatorios comunes sobre el estimador condicional
+    u = rng.random(int(n * p_apprehension) or 1)
+    base, draws = conditional(rng, n, p_base, u)
+    alt, _ = conditional(rng, n, p_alt, u)
+    return alt - base, draws
+
+
+def replicate(estimator, n, replications, seed, **kwargs):
+    rng = np.random.default_rng(seed)
+    results = [estimator(rng, n, **kwargs) for _ in range(replications)]
+    estimates = np.array([r[0] for r in results])
+    draws = np.mean([r[1] for r in results])
+    return estimates, draws
+
+
+def report(title, rows, reference, half_width):
+    # Factor de reducción de varianza por número aleatorio usado:
+    # VRF = (Var_crudo * draws_crudo) / (Var_método * draws_método)
+    ref_var = np.nanvar(rows[reference][0], ddof=1) * rows[reference][1]
+
+    print(f"\n{title}")
+    print(f"{'método':<26}{'estimación':>11}{'IC 95% ±':>11}{'draws':>11}{'VRF':>9}{f'draws p/ ±{half_width}':>18}")
+    for name, (estimates, draws) in rows.items():
+        var = np.nanvar(estimates, ddof=1)
+        ci = 1.96 * np.sqrt(var)
+        vrf = ref_var / (var * draws) if var > 0 else np.inf
+        needed = draws * (ci / half_width) ** 2
+        print(f"{name:<26}{np.nanmean(estimates):>11.4f}{ci:>11.4f}{draws:>11.0f}{vrf:>9.1f}{needed:>18,.0f}")
+
+
+def compare(n, replications, seed, q, p_alt, half_width):
+    rows = {
+        "crudo": replicate(crude, n, replications, seed),
+        "condicional": replicate(conditional, n, replications, seed),
+        "condicional + antitético": replicate(conditional_antithetic, n, replications, seed),
+    }
+    report(f"P(traslado | aprehensión) = {p_transport}, {n:,} patrullajes x {replications} réplicas",
+           rows, "crudo", half_width)
+
+    rows = {
+        "crudo": replicate(crude_joint, n, replications, seed),
+        f"importancia (q={q})": replicate(importance_joint, n, replications, seed, q=q),
+    }
+    report(f"P(aprehensión y traslado) = {p_apprehension * p_transport:g} por patrullaje",
+           rows, "crudo", half_width * p_apprehension)
+
+    rows = {
+        "crudo independiente": replicate(crude_difference, n, replications, seed, p_base=p_transport, p_alt=p_alt),
+        "crudo + CRN": replicate(crn_difference, n, replications, seed, p_base=p_transport, p_alt=p_alt),
+        "condicional + CRN": replicate(crn_conditional_difference, n, replications, seed,
+                                       p_base=p_transport, p_alt=p_alt),
+    }
+    report(f"Diferencia de escenarios: traslado {p_alt} vs {p_transport} (verdadera {p_alt - p_transport:+.2f})",
+           rows, "crudo independiente", half_width)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Probabilidad de traslado dada una aprehensión")
+    parser.add_argument("--compare", action="store_true",
+                        help="Comparar estimadores de reducción de varianza contra Monte Carlo crudo")
+    parser.add_argument("--iterations", type=int, default=iterations // 10,
+                        help="Patrullajes por réplica en --compare (default: %(default)s)")
+    parser.add_argument("--replications", type=int, default=200, help="Réplicas por estimador (default: 200)")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla (default: 0)")
+    parser.add_argument("--proposal", type=float, default=0.5,
+                        help="Probabilidad de aprehensión propuesta en muestreo por importancia (default: 0.5)")
+    parser.add_argument("--alt-transport", type=float, default=0.65,
+                        help="Probabilidad de traslado del escenario alterno para CRN (default: 0.65)")
+    parser.add_argument("--half-width", type=float, default=0.005,
+                        help="Semiancho de IC objetivo para estimar los draws necesarios (default: 0.005)")
+    args = parser.parse_args()
 
-    if apprehensions > 0:
-        freqs.append(transports / apprehensions)
+    if args.compare:
+        compare(args.iterations, args.replications, args.seed, args.proposal, args.alt_transport, args.half_width)
     else:
-        freqs.append(0)
-
-plt.plot(freqs, label="Frecuencia relativa de traslado")
-plt.axhline(p_transport, color="red", linestyle="--", label="Valor esperado (0.6)")
-plt.xlabel("Iteraciones")
-plt.ylabel("Frecuencia relativa")
-plt.legend()
-plt.grid(True)
-plt.show()
-
-print(
-    "Probabilidad final aproximada:",
-    transports / apprehensions if apprehensions > 0 else 0,
-)
+        plot_convergence(iterations)